@@ -3,5 +3,8 @@
 echo Starting migrations...
 python manage.py migrate
 
+echo Reindexing stale articles...
+python manage.py initsearch --stale
+
 echo Starting server...
 exec gunicorn scpdev.wsgi -w 32 -t 300 -b 0.0.0.0:8000 --preload
\ No newline at end of file
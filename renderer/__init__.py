@@ -197,6 +197,23 @@ def single_pass_render(source, context=None, mode='article') -> str:
         return SafeString(html.body)
 
 
+# Renders several sources with the same context; callbacks and page info are built once for the batch
+def single_pass_render_many(sources, context=None, mode='article') -> list[str]:
+    from ftml import ftml
+
+    page_vars = get_page_vars(context.article) if context else {}
+    callbacks = callbacks_with_context(context)
+    page_info = page_info_from_context(context)
+
+    rendered = []
+    for source in sources:
+        with threadvars.context():
+            source = apply_template(source, lambda param: get_this_page_params(page_vars, param))
+            html = ftml.render_html(source, callbacks, page_info, mode)
+            rendered.append(SafeString(html.body))
+    return rendered
+
+
 def single_pass_render_with_excerpt(source, context=None, mode='article') -> tuple[str, str, Optional[str]]:
     from ftml import ftml
 
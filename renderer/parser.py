@@ -6,6 +6,11 @@ User = get_user_model()
 
 
 class RenderContext(object):
+    __slots__ = (
+        'article', 'source_article', 'path_params', 'user', 'title', 'status',
+        'redirect_to', 'add_css', 'computed_style', 'og_description', 'og_image'
+    )
+
     def __init__(self, article=None, source_article=None, path_params=None, user=None):
         self.article = article
         self.source_article = source_article
@@ -1,14 +1,17 @@
 from solo.admin import SingletonModelAdmin
 from adminsortable2.admin import SortableAdminMixin
 
+from django.db import transaction
 from django.db.models.query import QuerySet
-from django.db.models import ExpressionWrapper, F, Case, When, BooleanField
+from django.db.models import ExpressionWrapper, F, Q, Case, When, Count
 from django.contrib.admin import SimpleListFilter
+from django.contrib.admin.views.main import ChangeList
 from django.contrib.auth.models import Permission
 from django.contrib.auth.admin import UserAdmin
 from django.contrib.auth.forms import UserChangeForm
 from django.contrib import admin
 from django.urls import path
+from django.utils.translation import gettext_lazy as _
 from django import forms
 
 import web.fields
@@ -109,9 +112,9 @@ class CategoryForm(forms.ModelForm):
             self.fields['_perms_override_'].widget.instance = instance
 
             # 获取已配置权限重写的角色，用于区分添加/移除的角色列表
-            overrided_roles = Role.objects.filter(rolepermissionsoverride__in=instance.permissions_override.all())
-            self.fields['_add_override_roles_'].queryset = Role.objects.exclude(id__in=overrided_roles)
-            self.fields['_remove_override_roles_'].queryset = overrided_roles
+            overrided_ids = set(instance.permissions_override.values_list('role_id', flat=True))
+            self.fields['_add_override_roles_'].queryset = Role.objects.exclude(id__in=overrided_ids)
+            self.fields['_remove_override_roles_'].queryset = Role.objects.filter(id__in=overrided_ids)
         else:
             self.fields['_perms_override_'].widget.instance = None
             self.fields['_add_override_roles_'].queryset = Role.objects.all()
@@ -119,49 +122,57 @@ class CategoryForm(forms.ModelForm):
 
     def save(self, commit=True):
         """重写保存逻辑：处理角色权限重写的添加/移除"""
-        instance = super().save(commit=False)
-        instance.save()
+        with transaction.atomic():
+            instance = super().save(commit=False)
+            instance.save()
 
-        # 处理权限重写配置
-        roles_data = self.cleaned_data.get('_perms_override_', {})
-        if roles_data:
-            content_type = get_role_permissions_content_type()
-            overrides = []
+            # 处理权限重写配置
+            roles_data = self.cleaned_data.get('_perms_override_', {})
+            if roles_data:
+                content_type = get_role_permissions_content_type()
 
-            # 先清空原有权限重写配置
-            instance.permissions_override.all().delete()
+                # 先清空原有权限重写配置
+                RolePermissionsOverride.objects.filter(category=instance).delete()
 
-            # 批量创建新的权限重写记录
-            for role_id, perms_data in roles_data.items():
-                perms_override = RolePermissionsOverride.objects.create(role_id=role_id)
+                # 批量创建新的权限重写记录
+                overrides = RolePermissionsOverride.objects.bulk_create(
+                    [RolePermissionsOverride(role_id=role_id) for role_id in roles_data]
+                )
 
-                if perms_data['allow']:
-                    perms = Permission.objects.filter(codename__in=perms_data['allow'], content_type=content_type)
-                    perms_override.permissions.set(perms)
+                # 一次性查询本次提交涉及的全部权限
+                all_codenames = set()
+                for perms_data in roles_data.values():
+                    all_codenames.update(perms_data['allow'], perms_data['deny'])
+                perms_by_codename = dict(
+                    Permission.objects.filter(codename__in=all_codenames, content_type=content_type).values_list('codename', 'id')
+                )
 
-                if perms_data['deny']:
-                    restrictions = Permission.objects.filter(codename__in=perms_data['deny'], content_type=content_type)
-                    perms_override.restrictions.set(restrictions)
+                for perms_override, perms_data in zip(overrides, roles_data.values()):
+                    if perms_data['allow']:
+                        perms = [perms_by_codename[c] for c in perms_data['allow'] if c in perms_by_codename]
+                        perms_override.permissions.set(perms)
 
-                overrides.append(perms_override)
+                    if perms_data['deny']:
+                        restrictions = [perms_by_codename[c] for c in perms_data['deny'] if c in perms_by_codename]
+                        perms_override.restrictions.set(restrictions)
 
-            instance.permissions_override.add(*overrides)
+                instance.permissions_override.add(*overrides)
 
-        # 处理添加需重写权限的角色
-        roles_to_override = self.cleaned_data.get('_add_override_roles_', {})
-        if roles_to_override:
-            overrides = []
-            for role in roles_to_override:
-                overrides.append(RolePermissionsOverride.objects.create(role=role))
-            instance.permissions_override.add(*overrides)
+            # 处理添加需重写权限的角色
+            roles_to_override = self.cleaned_data.get('_add_override_roles_', {})
+            if roles_to_override:
+                overrides = RolePermissionsOverride.objects.bulk_create(
+                    [RolePermissionsOverride(role=role) for role in roles_to_override]
+                )
+                instance.permissions_override.add(*overrides)
 
-        # 处理移除权限重写的角色
-        roles_to_cancel_override = self.cleaned_data.get('_remove_override_roles_', {})
-        if roles_to_cancel_override:
-            instance.permissions_override.all().filter(role__in=roles_to_cancel_override).delete()
+            # 处理移除权限重写的角色
+            roles_to_cancel_override = self.cleaned_data.get('_remove_override_roles_', {})
+            if roles_to_cancel_override:
+                instance.permissions_override.filter(role__in=roles_to_cancel_override).delete()
 
-        if commit:
-            instance.save()
+            if commit:
+                instance.save()
 
         return instance
 
@@ -263,6 +274,18 @@ class AdvancedUserChangeForm(UserChangeForm):
             self.fields['roles'].queryset = Role.objects.exclude(slug__in=['everyone', 'registered'])
 
 
+class AdvancedUserChangeList(ChangeList):
+    """用户列表：仅加载列表页需要的字段"""
+    # inactive_until/forum_inactive_until在User.__init__中被访问，必须一并加载
+    only_fields = (
+        'id', 'username', 'wikidot_username', 'email', 'type',
+        'is_active', 'inactive_until', 'is_forum_active', 'forum_inactive_until'
+    )
+
+    def get_queryset(self, request, *args, **kwargs):
+        return super().get_queryset(request, *args, **kwargs).only(*self.only_fields)
+
+
 @admin.register(User)
 class AdvancedUserAdmin(ProtectsensitiveAdminMixin, UserAdmin):
     """增强版用户后台管理配置（含权限控制+自定义URL）"""
@@ -274,11 +297,21 @@ class AdvancedUserAdmin(ProtectsensitiveAdminMixin, UserAdmin):
     readonly_fields = ['api_key', '_op_index']
     sensitive_fields = ['email']
 
-    # 重写字段分组
-    fieldsets = UserAdmin.fieldsets
-    fieldsets[0][1]['fields'] = ('username', 'wikidot_username', 'type', 'password', 'api_key', '_op_index')
-    fieldsets[1][1]['fields'] += ('bio', 'avatar')
-    fieldsets[2][1]['fields'] = ('is_active', 'inactive_until', 'is_forum_active', 'forum_inactive_until', 'roles', 'is_superuser')
+    # 重写字段分组（独立定义，避免修改UserAdmin.fieldsets）
+    fieldsets = (
+        (None, {
+            'fields': ('username', 'wikidot_username', 'type', 'password', 'api_key', '_op_index')
+        }),
+        (_('Personal info'), {
+            'fields': ('first_name', 'last_name', 'email', 'bio', 'avatar')
+        }),
+        (_('Permissions'), {
+            'fields': ('is_active', 'inactive_until', 'is_forum_active', 'forum_inactive_until', 'roles', 'is_superuser')
+        }),
+        (_('Important dates'), {
+            'fields': ('last_login', 'date_joined')
+        }),
+    )
 
     @admin.display(ordering='username_or_wd')
     def username_or_wd(self, obj):
@@ -290,6 +323,10 @@ class AdvancedUserAdmin(ProtectsensitiveAdminMixin, UserAdmin):
         """显示用户的权限索引值"""
         return obj.operation_index
 
+    def get_changelist(self, request, **kwargs):
+        """列表页使用精简字段的查询集"""
+        return AdvancedUserChangeList
+
     def get_urls(self):
         """添加自定义后台URL（邀请/创建机器人/激活用户/重置投票）"""
         urls = super().get_urls()
@@ -345,15 +382,13 @@ class AdvancedUserAdmin(ProtectsensitiveAdminMixin, UserAdmin):
     
     def save_model(self, request, obj, form, change):
         """保存时的权限控制：防止普通管理员修改超级管理员状态/角色"""
-        if obj.pk:
-            target = User.objects.get(id=obj.id)
-            if change:
-                # 非超级管理员无法修改超级管理员状态
-                if not request.user.is_superuser:
-                    obj.is_superuser = target.is_superuser
-                # 无角色管理权限的用户无法修改角色
-                if not request.user.has_perm('roles.manage_roles'):
-                    obj.roles.set(target.roles.all())
+        if obj.pk and change:
+            # 非超级管理员无法修改超级管理员状态
+            if not request.user.is_superuser:
+                obj.is_superuser = User.objects.filter(pk=obj.pk).values_list('is_superuser', flat=True).get()
+            # 无角色管理权限的用户无法修改角色：跳过角色的M2M写入
+            if not request.user.has_perm('roles.manage_roles'):
+                form.cleaned_data.pop('roles', None)
         super().save_model(request, obj, form, change)
 
 
@@ -370,6 +405,7 @@ class ActionsLogAdmin(ProtectsensitiveAdminMixin, admin.ModelAdmin):
     form = ActionsLogForm
     list_filter = ['user', 'type', 'created_at', 'origin_ip']
     list_display = ['user_or_name', 'type', 'info', 'created_at', 'origin_ip']
+    list_select_related = ['user']
     search_fields = ['meta']
     sensitive_fields = ['origin_ip']
 
@@ -434,29 +470,28 @@ class RoleForm(forms.ModelForm):
 
     def save(self, commit=True):
         """重写保存逻辑：处理角色权限/限制配置"""
-        instance = super().save(commit=False)
-        instance.save()
+        with transaction.atomic():
+            instance = super().save(commit=False)
+            instance.save()
 
-        perms_data = self.cleaned_data.get('_perms_', {})
-        if perms_data:
-            content_type = get_role_permissions_content_type()
+            perms_data = self.cleaned_data.get('_perms_', {})
+            if perms_data:
+                content_type = get_role_permissions_content_type()
 
-            # 清空原有权限/限制
-            instance.permissions.clear()
-            instance.restrictions.clear()
+                # 一次性查询允许/禁止的全部权限
+                perms_by_codename = dict(
+                    Permission.objects.filter(codename__in=[*perms_data['allow'], *perms_data['deny']], content_type=content_type).values_list('codename', 'id')
+                )
 
-            # 设置允许的权限
-            if perms_data['allow']:
-                perms = Permission.objects.filter(codename__in=perms_data['allow'], content_type=content_type)
+                # 设置允许/禁止的权限（仅增删差异部分）
+                perms = [perms_by_codename[c] for c in perms_data['allow'] if c in perms_by_codename]
                 instance.permissions.set(perms)
 
-            # 设置禁止的权限
-            if perms_data['deny']:
-                restrictions = Permission.objects.filter(codename__in=perms_data['deny'], content_type=content_type)
+                restrictions = [perms_by_codename[c] for c in perms_data['deny'] if c in perms_by_codename]
                 instance.restrictions.set(restrictions)
 
-        if commit:
-            instance.save()
+            if commit:
+                instance.save()
 
         return instance
 
@@ -473,14 +508,14 @@ class IsVisualRoleFilter(SimpleListFilter):
         ]
 
     def queryset(self, request, queryset):
-        """筛选逻辑：判断角色是否有可视化配置"""
-        if self.value():
-            return queryset.annotate(is_visual_role=ExpressionWrapper(
-                F('group_votes') or \
-                F('inline_visual_mode') != Role.InlineVisualMode.Hidden or \
-                F('profile_visual_mode') != Role.ProfileVisualMode.Hidden,
-                output_field=BooleanField()
-            )).filter(is_visual_role=self.value())
+        """筛选逻辑：判断角色是否有可视化配置（与Role.is_visual一致）"""
+        is_visual = Q(group_votes=True) | \
+            ~Q(inline_visual_mode=Role.InlineVisualMode.Hidden) | \
+            ~Q(profile_visual_mode=Role.ProfileVisualMode.Hidden)
+        if self.value() == 'True':
+            return queryset.filter(is_visual)
+        elif self.value() == 'False':
+            return queryset.exclude(is_visual)
         else:
             return queryset
 
@@ -490,6 +525,7 @@ class RoleAdmin(SortableAdminMixin, admin.ModelAdmin):
     form = RoleForm
     list_filter = ['category', 'is_staff', IsVisualRoleFilter]
     list_display = ['__str__', '_users_number', '_idx']
+    list_select_related = ['category']
     fieldsets = (
         (None, {
             'fields': ('slug', 'name', 'short_name', 'category', 'is_staff')
@@ -511,9 +547,13 @@ class RoleAdmin(SortableAdminMixin, admin.ModelAdmin):
     def _users_number(self, obj):
         """显示拥有该角色的用户数量（默认角色显示总用户数）"""
         if obj.slug in ['everyone', 'registered']:
-            return User.objects.all().count()
-        return obj.users.all().count()
+            return User.objects.count()
+        return obj._users_count
     
+    def get_queryset(self, request):
+        """预先统计每个角色的用户数量，并关联加载角色分类"""
+        return super().get_queryset(request).annotate(_users_count=Count('users')).select_related('category')
+
     @property
     def change_list_template(self):
         """自定义列表模板路径"""
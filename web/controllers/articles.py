@@ -9,9 +9,12 @@ from typing import Optional, Union, Sequence, Tuple, Dict
 
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser as _UserType, AnonymousUser
+from django.core.cache import cache
 from django.db import transaction
-from django.db.models import QuerySet, Sum, Avg, Count, Max, IntegerField, Q, F
-from django.db.models.functions import Coalesce
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.db.models import QuerySet, Sum, Avg, Count, Max, IntegerField, Q, F, Case, When, Value, OuterRef, Subquery
+from django.db.models.functions import Cast, Coalesce, Concat, JSONObject
 
 import renderer
 from web.events import EventBase
@@ -23,6 +26,7 @@ from web.models.site import get_current_site
 from web.models.users import User
 from web.models.forum import ForumThread, ForumPost
 from web.models.roles import Role
+from web.fields import CITextField
 from web.util import lock_table
 
 
@@ -130,6 +134,17 @@ def get_article(full_name_or_article: _FullNameOrArticle) -> Optional[Article]:
     return full_name_or_article
 
 
+# Gets article and its category by full name, parsing the name only once.
+# Category is attached to the article, so permission checks on the article do not look it up again.
+def get_article_and_category(full_name: str) -> Tuple[Optional[Article], Optional[Category]]:
+    category_name, name = get_name(full_name.lower())
+    article = Article.objects.filter(category=category_name, name=name).first()
+    category = get_category(category_name)
+    if article is not None:
+        article.__dict__['category_as_object'] = category
+    return article, category
+
+
 def get_full_name(full_name_or_article: _FullNameOrArticle) -> str:
     if full_name_or_article is None:
         return ''
@@ -198,11 +213,12 @@ def get_latest_log_entry(full_name_or_article: _FullNameOrArticle) -> Optional[A
 
 # Gets list of log entries from article, sorted, with specified bounds
 def get_log_entries_paged(full_name_or_article: _FullNameOrArticle, c_from: int, c_to: int, get_all: bool = False) -> Tuple[QuerySet[ArticleLogEntry], int]:
-    log_entries = get_log_entries(full_name_or_article)
-    total_count = len(log_entries)
-    if not get_all:
-        log_entries = log_entries[c_from:c_to]
-    return log_entries, total_count
+    log_entries = get_log_entries(full_name_or_article).select_related('user')
+    if get_all:
+        log_entries = list(log_entries)
+        return log_entries, len(log_entries)
+    # count in DB instead of loading the whole history just to get its length
+    return log_entries[c_from:c_to], log_entries.count()
 
 
 # Revert all revisions to specific revision
@@ -573,24 +589,17 @@ def refresh_article_links(article_version: ArticleVersion):
     # drop all links known before
     ExternalLink.objects.filter(link_from=article_name).delete()
     # parse current source
-    already_added = []
+    already_added = dict()
     rc = renderer.RenderContext(article=article_version.article, source_article=article_version.article, path_params={}, user=None)
     linked_pages, included_pages = renderer.single_pass_fetch_backlinks(article_version.source, rc)
-    for linked_page in linked_pages:
-        kt = '%s:include:%s' % (article_name.lower(), linked_page.lower())
-        if kt in already_added:
-            continue
-        already_added.append(kt)
-        new_link = ExternalLink(link_from=article_name.lower(), link_type=ExternalLink.Type.Include, link_to=linked_page.lower())
-        new_link.save()
-    # find links
-    for included_page in included_pages:
-        kt = '%s:link:%s' % (article_name.lower(), included_page.lower())
-        if kt in already_added:
-            continue
-        already_added.append(kt)
-        new_link = ExternalLink(link_from=article_name.lower(), link_type=ExternalLink.Type.Link, link_to=included_page.lower())
-        new_link.save()
+    link_from = article_name.lower()
+    for link_type, pages in ((ExternalLink.Type.Include, linked_pages), (ExternalLink.Type.Link, included_pages)):
+        for page in pages:
+            kt = (link_type, page.lower())
+            if kt not in already_added:
+                already_added[kt] = ExternalLink(link_from=link_from, link_type=link_type, link_to=kt[1])
+    # insert all links at once
+    ExternalLink.objects.bulk_create(list(already_added.values()), batch_size=500, ignore_conflicts=True)
 
 
 # Updates name of article
@@ -743,6 +752,40 @@ def get_latest_source(full_name_or_article: _FullNameOrArticle) -> Optional[str]
     return None
 
 
+# Category template sources are cached briefly: previews re-request them on every keystroke.
+# Local saves invalidate immediately, the timeout bounds staleness across worker processes.
+CATEGORY_TEMPLATE_CACHE_TIMEOUT = 60
+
+_NO_TEMPLATE = ''
+
+
+def _category_template_cache_key(category: str) -> str:
+    site = get_current_site(required=False)
+    return 'category_template:%s:%s' % (site.pk if site else None, category.lower())
+
+
+# Get source of the category's _template article, or None if there is none
+def get_category_template_source(category: str) -> Optional[str]:
+    key = _category_template_cache_key(category)
+    source = cache.get(key)
+    if source is None:
+        template = get_article('%s:_template' % category)
+        source = (get_latest_source(template) if template else None) or _NO_TEMPLATE
+        cache.set(key, source, CATEGORY_TEMPLATE_CACHE_TIMEOUT)
+    return source or None
+
+
+@receiver([post_save, post_delete], sender=Article)
+def _invalidate_category_template_on_article_change(sender, instance: Article, **kwargs):
+    cache.delete(_category_template_cache_key(instance.category))
+
+
+@receiver(post_save, sender=ArticleVersion)
+def _invalidate_category_template_on_new_version(sender, instance: ArticleVersion, **kwargs):
+    if instance.article.name.lower() == '_template':
+        cache.delete(_category_template_cache_key(instance.article.category))
+
+
 # Get source of article at specific revision number
 def get_source_at_rev_num(full_name_or_article: _FullNameOrArticle, rev_num: int) -> Optional[str]:
     article = get_article(full_name_or_article)
@@ -947,60 +990,57 @@ def get_rating(full_name_or_article: _FullNameOrArticle) -> tuple[int | float, i
         raise ValueError('Unsupported rate type "%s"' % obj_settings.rating_mode)
     
 
-# Returns dict {article_id: (rating, votes_count, popularity, mode)}
-def get_all_ratings(articles_qs):
-    category_names = list(
-        articles_qs.values_list("category", flat=True).distinct()
-    )
+def _get_ratings(articles_list: Sequence[Article], votes_qs: QuerySet) -> Dict[int, tuple[int | float, int, int, Settings.RatingMode]]:
     categories_map = {
-        c.name: c for c in Category.objects.filter(name__in=category_names).select_related("_settings")
+        c.name.lower(): c for c in Category.objects.filter(name__in={a.category for a in articles_list}).select_related('_settings')
     }
-
-    current_site = get_current_site()
-    site_settings = current_site.settings
-    default_settings = Settings.get_default_settings()
+    base_settings = Settings.get_default_settings().merge(get_current_site().settings)
 
     vote_stats = (
-        Vote.objects
-        .values("article_id")
+        votes_qs
+        .values('article_id')
         .annotate(
-            sum_rate=Coalesce(Sum("rate"), 0.0),
-            count_rate=Count("rate"),
-            good_updown=Count("rate", filter=Q(rate=1)),
-            avg_rate=Coalesce(Avg("rate"), 0.0),
-            good_stars=Count("rate", filter=Q(rate__gte=3))
+            sum=Coalesce(Sum('rate'), 0, output_field=IntegerField()),
+            avg=Coalesce(Avg('rate'), 0.0),
+            count=Count('rate'),
+            good_updown=Count('rate', filter=Q(rate=1)),
+            good_stars=Count('rate', filter=Q(rate__gte=3))
         )
     )
-    votes_map = {v["article_id"]: v for v in vote_stats}
+    votes_map = {v['article_id']: v for v in vote_stats}
 
     results = {}
-    for article in articles_qs:
-        cat = categories_map.get(article.category)
-        category_settings = getattr(cat, "_settings", None)
-        merged_settings = default_settings.merge(site_settings).merge(category_settings)
+    for article in articles_list:
+        category = categories_map.get(article.category.lower())
+        obj_settings = base_settings.merge(getattr(category, '_settings', None)) if category else base_settings
+        # fill the per-article caches so that later article.settings calls don't query again
+        article.__dict__['category_as_object'] = category
+        article.__dict__['settings'] = obj_settings
 
-        rating_mode = merged_settings.rating_mode
         votes = votes_map.get(article.id, {})
-
-        if rating_mode == Settings.RatingMode.UpDown:
-            rating_value = votes.get("sum_rate", 0)
-            votes_count = votes.get("count_rate", 0)
-            popularity = round((votes.get("good_updown", 0) / (votes_count or 1)) * 100)
-        elif rating_mode == Settings.RatingMode.Stars:
-            rating_value = round(votes.get("avg_rate", 0.0), 1)
-            votes_count = votes.get("count_rate", 0)
-            popularity = round((votes.get("good_stars", 0) / (votes_count or 1)) * 100)
+        count = votes.get('count') or 0
+        if obj_settings.rating_mode == Settings.RatingMode.UpDown:
+            results[article.id] = votes.get('sum') or 0, count, round((votes.get('good_updown') or 0) / (count or 1) * 100), obj_settings.rating_mode
+        elif obj_settings.rating_mode == Settings.RatingMode.Stars:
+            results[article.id] = round(votes.get('avg') or 0.0, 1) or 0.0, count, round((votes.get('good_stars') or 0) / (count or 1) * 100), obj_settings.rating_mode
         else:
-            rating_value = votes_count = popularity = 0
+            results[article.id] = 0, 0, 0, obj_settings.rating_mode
+    return results
 
-        results[article.id] = (
-            rating_value,
-            votes_count,
-            popularity,
-            rating_mode,
-        )
 
-    return results
+# Same as get_rating, but for a batch of articles: one query for categories and one for votes.
+# Returns dict {article_id: (rating, votes_count, popularity, mode)}
+def get_ratings_for(articles_list: Sequence[Article]) -> Dict[int, tuple[int | float, int, int, Settings.RatingMode]]:
+    if not articles_list:
+        return {}
+    return _get_ratings(articles_list, Vote.objects.filter(article_id__in=[a.id for a in articles_list]))
+
+
+# Same as get_ratings_for, but aggregates all votes at once instead of filtering by article ids;
+# meant for (nearly) all articles of the site.
+# Returns dict {article_id: (rating, votes_count, popularity, mode)}
+def get_all_ratings(articles_qs):
+    return _get_ratings(list(articles_qs), Vote.objects.all())
 
 
 def get_formatted_rating(full_name_or_article: _FullNameOrArticle) -> str:
@@ -1168,16 +1208,19 @@ def rename_file_in_article(full_name_or_article: _FullNameOrArticle, file: File,
     media.symlinks_article_update(article)
 
 
+_RESERVED_FULL_NAMES = frozenset(['-', '_', 'api', 'forum', 'local--files', 'local--code', 'local--html', 'local--theme'])
+_FULL_NAME_REGEX = re.compile(r'^[A-Za-z0-9\-_:]+$')
+
+
 # Check if name is allowed for creation
 # Pretty much this blocks six 100% special paths, everything else is OK
 def is_full_name_allowed(article_name: str) -> bool:
     article_name = article_name.lower()
-    reserved = ['-', '_', 'api', 'forum', 'local--files', 'local--code', 'local--html', 'local--theme']
-    if article_name in reserved:
+    if article_name in _RESERVED_FULL_NAMES:
         return False
     if len(article_name) > 128:
         return False
-    if not re.match(r'^[A-Za-z0-9\-_:]+$', article_name):
+    if not _FULL_NAME_REGEX.match(article_name):
         return False
     category, name = get_name(article_name)
     if not category.strip() or not name.strip():
@@ -1185,25 +1228,29 @@ def is_full_name_allowed(article_name: str) -> bool:
     return True
 
 
-# Fetch multiple articles by names
-def fetch_articles_by_names(original_names):
-    names = list(dict.fromkeys([('_default:%s' % x).lower() if ':' not in x else x.lower() for x in original_names]))
-    all_articles = Article.objects.filter(complete_full_name__in=names)
-    ret_map = dict()
-    for article in all_articles:
-        ret_map[article.complete_full_name] = article
-    articles_dict = dict()
-    for name in original_names:
-        dumb_name = ('_default:%s' % name).lower() if ':' not in name else name.lower()
-        articles_dict[name] = ret_map[dumb_name]
-    return articles_dict
+# Gets links pointing to article along with their source articles, in a single query.
+# Returns (lowercased link_from, link_type, source article or None); source articles contain only category, name and title.
+def get_external_links_to(full_name: str) -> list[tuple[str, str, Optional[Article]]]:
+    # Case() is typed as text by Postgres, so cast back to citext to keep the match case-insensitive
+    source_name = Cast(Case(
+        When(link_from__contains=':', then=F('link_from')),
+        default=Concat(Value('_default:'), F('link_from'), output_field=CITextField()),
+        output_field=CITextField()
+    ), CITextField())
+    source = Article.objects.filter(complete_full_name=OuterRef('source_name')).values(
+        data=JSONObject(category='category', name='name', title='title')
+    )[:1]
+    links = ExternalLink.objects.filter(link_to=full_name)\
+                                .annotate(source_name=source_name, source=Subquery(source))\
+                                .values_list('link_from', 'link_type', 'source')
+    return [(link_from.lower(), link_type, Article(**source) if source else None) for link_from, link_type, source in links]
 
 
 # Get hidden categories for specific user (none -> AnonymousUser)
 def get_hidden_categories_for(user: User) -> list[Category]:
     if user is None:
         user = AnonymousUser()
-    all_categories = Category.objects.all()
+    all_categories = Category.objects.prefetch_related('permissions_override__permissions', 'permissions_override__restrictions')
     hidden_categories = []
     for category in all_categories:
         if not user.has_perm('roles.view_articles', category):
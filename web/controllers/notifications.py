@@ -67,22 +67,20 @@ def is_subscribed(subscriber: _UserType, article: Article=None, forum_thread: Fo
 
 
 def get_notifications(user: _UserType, cursor=-1, limit=10, unread=True, mark_as_viewed=False) -> list[tuple[UserNotification, bool]]:
-    related = UserNotificationMapping.objects.all().order_by('-notification_id')
+    related = UserNotificationMapping.objects.filter(recipient=user).order_by('-notification_id')
 
-    if not related:
-        return []
-
-    if cursor == -1:
-        cursor = related.latest('notification_id').notification_id + 1
-
-    related = related.filter(recipient=user, notification_id__lt=cursor)
+    if cursor != -1:
+        related = related.filter(notification_id__lt=cursor)
     
     if unread:
         related = related.filter(is_viewed=False)
 
-    result = [(n.notification, n.is_viewed) for n in related[:limit]]
+    page = list(related.select_related('notification')[:limit])
+    result = [(n.notification, n.is_viewed) for n in page]
 
     if mark_as_viewed:
-        related.update(is_viewed=True)
+        unviewed_ids = [n.id for n in page if not n.is_viewed]
+        if unviewed_ids:
+            UserNotificationMapping.objects.filter(id__in=unviewed_ids).update(is_viewed=True)
         
     return result
@@ -1,19 +1,32 @@
 import json
 import base64
+import logging
+import threading
+import time
 
 from typing import Literal
 from uuid import uuid4
 
-from django.db import models
+from django.db import models, connection, transaction
 from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, SearchHeadline
 
 from renderer import RenderContext, single_pass_render_text
 
+from web import threadvars
 from web.controllers import articles
 from web.models import ArticleSearchIndex, Article
+from web.models.site import get_current_site
 from web.models.users import User
 
 
+# updates scheduled within this window are coalesced into one indexation per article
+SEARCH_INDEX_UPDATE_DELAY = 1.0
+
+_search_index_queue = dict()
+_search_index_lock = threading.Lock()
+_search_index_worker = None
+
+
 def search_articles(text, user: User=None, is_source=False, cursor=None, limit=25, explain=False):
     hidden_categories = articles.get_hidden_categories_for(user)
     if is_source:
@@ -23,7 +36,10 @@ def search_articles(text, user: User=None, is_source=False, cursor=None, limit=2
             content_source__icontains=text,
         ).exclude(
             article__category__in=hidden_categories
-        ).order_by('-id')
+        ).defer(
+            # only the source is needed to build excerpts
+            'vector_plaintext', 'content_plaintext'
+        ).select_related('article').order_by('-id')
         if cursor_parameters:
             results = results.filter(cursor_parameters)
         results = results[:limit]
@@ -95,7 +111,10 @@ def search_articles(text, user: User=None, is_source=False, cursor=None, limit=2
             models.Q(vector_plaintext=search_query)
         ).exclude(
             article__category__in=hidden_categories
-        ).order_by('-rank_str', '-id')
+        ).defer(
+            # only the plaintext is needed to build excerpts; the vector is used by the query itself
+            'vector_plaintext', 'content_source'
+        ).select_related('article').order_by('-rank_str', '-id')
         if cursor_parameters:
             results = results.filter(cursor_parameters)
         results = results[:limit]
@@ -162,6 +181,9 @@ def encode_cursor(cursor_type: Literal['source', 'plain'], parameters: list[dict
 
 
 def update_search_index(article: Article):
+    # cleared before indexing, so edits made meanwhile mark the article stale again
+    Article.objects.filter(id=article.id).update(search_index_stale=False)
+
     version = articles.get_latest_version(article)
 
     if version is None:
@@ -179,3 +201,59 @@ def update_search_index(article: Article):
     ArticleSearchIndex.objects.filter(pk=search_obj.pk).update(
         vector_plaintext=SearchVector('content_plaintext', config='english') + SearchVector('content_plaintext', config='russian')
     )
+
+
+# Indexes all articles queued so far in the calling thread.
+def flush_search_index_updates():
+    with _search_index_lock:
+        pending = dict(_search_index_queue)
+        _search_index_queue.clear()
+    for article_id, site in pending.items():
+        # rendering needs the site the update was scheduled from
+        with threadvars.context():
+            threadvars.put('current_site', site)
+            try:
+                article = Article.objects.filter(id=article_id).first()
+                if article is not None:
+                    update_search_index(article)
+            except Exception:
+                # mark it stale again so that `initsearch --stale` picks it up
+                Article.objects.filter(id=article_id).update(search_index_stale=True)
+                logging.exception('Failed to update search index for article %d', article_id)
+
+
+def _search_index_worker_loop():
+    global _search_index_worker
+    try:
+        while True:
+            time.sleep(SEARCH_INDEX_UPDATE_DELAY)
+            with _search_index_lock:
+                if not _search_index_queue:
+                    _search_index_worker = None
+                    return
+            flush_search_index_updates()
+    except Exception:
+        logging.exception('Search index worker failed')
+        with _search_index_lock:
+            _search_index_worker = None
+    finally:
+        connection.close()
+
+
+def _enqueue_search_index_update(article_id, site):
+    global _search_index_worker
+    with _search_index_lock:
+        _search_index_queue[article_id] = site
+        if _search_index_worker is None:
+            _search_index_worker = threading.Thread(target=_search_index_worker_loop, daemon=True)
+            _search_index_worker.start()
+
+
+# Updates search index in background thread, after the current transaction commits.
+# The queue is per process: the article is also marked stale in the current transaction,
+# so an update lost to a worker restart is redone by `initsearch --stale`.
+def schedule_search_index_update(article: Article):
+    article_id = article.id
+    site = get_current_site(required=False)
+    Article.objects.filter(id=article_id).update(search_index_stale=True)
+    transaction.on_commit(lambda: _enqueue_search_index_update(article_id, site))
@@ -11,8 +11,13 @@ from web.models import Article, Site
 class Command(BaseCommand):
     help = 'Recreates index for article text search.\nNote: very heavy operation.\nUsually done after bulk import or migrating the database.\nPer-article indexes will be updated on-demand and do not require running this'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--stale', action='store_true', help='Only reindex articles marked stale (e.g. background updates lost to a worker restart)')
+
     def handle(self, *args, **options):
         all_articles = Article.objects.all()
+        if options['stale']:
+            all_articles = all_articles.filter(search_index_stale=True)
 
         if not all_articles:
             return
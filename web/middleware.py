@@ -1,11 +1,14 @@
 from django.conf import settings
-from django.db.models import Q
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 from django.http import HttpResponseRedirect
 from django.core.exceptions import PermissionDenied
 from django.contrib.auth import get_user_model
 from django.shortcuts import render
 
 from web.models.site import Site
+from web.models.settings import Settings
 from web import threadvars
 
 import logging
@@ -15,6 +18,36 @@ import urllib.parse
 
 User = get_user_model()
 
+# 媒体文件路径前缀（匹配这些前缀的视为媒体请求）
+MEDIA_PATH_PREFIXES = tuple(f'/{x}/' for x in ['local--files', 'local--code', 'local--html', 'local--theme'])
+
+CSRF_TRUSTED_HOSTS_CACHE_KEY = 'csrf_trusted_hosts'
+CSRF_TRUSTED_HOSTS_CACHE_TIMEOUT = 60
+
+
+SITE_HOSTS_CACHE_KEY = 'site_hosts'
+SITE_HOSTS_CACHE_TIMEOUT = 60
+
+
+def _get_site_hosts():
+    """获取 域名 -> 站点 映射（共享缓存，短时过期；仅缓存失效时查询数据库）"""
+    hosts = cache.get(SITE_HOSTS_CACHE_KEY)
+    if hosts is None:
+        hosts = {}
+        for site in Site.objects.order_by('id'):
+            hosts.setdefault(site.domain, site)
+            hosts.setdefault(site.media_domain, site)
+        cache.set(SITE_HOSTS_CACHE_KEY, hosts, SITE_HOSTS_CACHE_TIMEOUT)
+    return hosts
+
+
+@receiver([post_save, post_delete], sender=Site)
+@receiver([post_save, post_delete], sender=Settings)
+def _invalidate_site_caches(sender, **kwargs):
+    """站点配置变更时清除相关缓存"""
+    cache.delete_many([CSRF_TRUSTED_HOSTS_CACHE_KEY, SITE_HOSTS_CACHE_KEY])
+
+
 class BotAuthTokenMiddleware(object):
     """机器人令牌认证中间件
     作用：通过请求头中的Bearer Token验证机器人账号身份，跳过CSRF验证
@@ -25,14 +58,13 @@ class BotAuthTokenMiddleware(object):
     def __call__(self, request):
         # 检查请求头中是否包含Authorization且以Bearer开头
         if "Authorization" in request.headers and request.headers["Authorization"].startswith("Bearer "):
-            try:
-                # 提取Token并匹配机器人用户（type=bot）的api_key
-                request.user = User.objects.get(type="bot", api_key=request.headers["Authorization"][7:])
+            # 提取Token并匹配机器人用户（type=bot）的api_key
+            user = User.objects.filter(type="bot", api_key=request.headers["Authorization"][7:]).first()
+            # Token无效时不做处理，继续走正常认证流程
+            if user is not None:
+                request.user = user
                 # 标记CSRF验证已完成，跳过后续CSRF检查
                 setattr(request, 'csrf_processing_done', True)
-            except User.DoesNotExist:
-                # Token无效时不做处理，继续走正常认证流程
-                pass
         return self.get_response(request)
 
 
@@ -70,39 +102,37 @@ class MediaHostMiddleware(object):
         # 设置当前站点上下文（线程隔离）
         with threadvars.context():
             # 第一步：根据请求域名匹配对应的Site实例
-            raw_host = request.get_host()
+            host = request.get_host()
             # 补充端口号（确保域名+端口的完整匹配）
-            if ':' not in raw_host and 'SERVER_PORT' in request.META:
-                raw_host += ':' + request.META['SERVER_PORT']
-                possible_sites = Site.objects.filter(Q(domain=raw_host) | Q(media_domain=raw_host))
+            if ':' not in host and 'SERVER_PORT' in request.META:
+                host_with_port = host + ':' + request.META['SERVER_PORT']
             else:
-                possible_sites = []
-            
-            # 无匹配结果时，尝试仅匹配域名（忽略端口）
-            if not possible_sites:
-                raw_host = request.get_host().split(':')[0]
-                possible_sites = Site.objects.filter(Q(domain=raw_host) | Q(media_domain=raw_host))
-                
-                # 仍无匹配时的异常处理
-                if not possible_sites:
-                    if Site.objects.exists():
-                        logging.warning(f'该域名（{raw_host}）未配置站点信息')
-                        raise PermissionDenied()  # 拒绝访问
-                    else:
-                        # 无任何站点配置时，返回提示页面
-                        return render(request, 'no_site.html')
-
-            # 取第一个匹配的站点作为当前站点
-            site = possible_sites[0]
+                host_with_port = None
+            # 同时尝试仅匹配域名（忽略端口）
+            raw_host = host.partition(':')[0]
+
+            # 优先匹配带端口的域名（站点变更时通过信号清除缓存）
+            site_hosts = _get_site_hosts()
+            site = site_hosts.get(host_with_port) if host_with_port else None
+            if site is None:
+                site = site_hosts.get(raw_host)
+
+            # 无匹配时的异常处理
+            if site is None:
+                if site_hosts:
+                    logging.warning(f'该域名（{raw_host}）未配置站点信息')
+                    raise PermissionDenied()  # 拒绝访问
+                else:
+                    # 无任何站点配置时，返回提示页面
+                    return render(request, 'no_site.html')
+
             threadvars.put('current_site', site)
 
             # 第二步：判断当前请求是否为媒体域名/媒体路径
             # 判断是否访问媒体域名（忽略端口）
-            is_media_host = request.get_host().split(':')[0] == site.media_domain
-            # 定义媒体文件路径前缀（匹配这些前缀的视为媒体请求）
-            media_prefixes = ['local--files', 'local--code', 'local--html', 'local--theme']
+            is_media_host = raw_host == site.media_domain
             # 判断当前请求路径是否为媒体路径
-            is_media_url = bool([x for x in media_prefixes if request.path.startswith(f'/{x}/')])
+            is_media_url = request.path.startswith(MEDIA_PATH_PREFIXES)
 
             # 第三步：跨域名访问时重定向（主域名≠媒体域名时生效）
             if site.media_domain != site.domain:
@@ -152,18 +182,26 @@ class CsrfViewMiddleware(django.middleware.csrf.CsrfViewMiddleware):
 
     @property
     def csrf_trusted_origins_hosts(self):
-        """获取所有站点的主域名作为CSRF可信源"""
-        return [site.domain for site in Site.objects.all()]
+        """获取所有站点的主域名作为CSRF可信源（结果缓存，站点变更时失效）"""
+        return cache.get_or_set(
+            CSRF_TRUSTED_HOSTS_CACHE_KEY,
+            lambda: list(Site.objects.values_list('domain', flat=True)),
+            CSRF_TRUSTED_HOSTS_CACHE_TIMEOUT
+        )
 
     @property
     def allowed_origins_exact(self):
-        """生成精确匹配的允许源列表（包含不同协议/端口）"""
-        port = ':' + str(self.request.META['SERVER_PORT'])
-        hosts = self.csrf_trusted_origins_hosts
-        return \
-            [f'http://{host}{port}' for host in hosts] +\
-            [f'http://{host}' for host in hosts] +\
-            [f'https://{host}' for host in hosts]
+        """生成精确匹配的允许源列表（包含不同协议/端口），每个请求只计算一次"""
+        origins = getattr(self.request, '_csrf_allowed_origins_exact', None)
+        if origins is None:
+            port = ':' + str(self.request.META['SERVER_PORT'])
+            hosts = self.csrf_trusted_origins_hosts
+            origins = \
+                [f'http://{host}{port}' for host in hosts] +\
+                [f'http://{host}' for host in hosts] +\
+                [f'https://{host}' for host in hosts]
+            self.request._csrf_allowed_origins_exact = origins
+        return origins
 
     @property
     def allowed_origin_subdomains(self):
@@ -184,11 +222,18 @@ class ForwardedPortMiddleware(object):
         self.get_response = get_response
 
     def __call__(self, request):
-        # 仅保留域名部分，移除端口号
-        request.META['HTTP_HOST'] = request.META['HTTP_HOST'].split(':')[0]
+        # 仅保留域名部分，移除端口号（无端口时不做改写）
+        host = request.META['HTTP_HOST']
+        port_pos = host.find(':')
+        if port_pos != -1:
+            request.META['HTTP_HOST'] = host[:port_pos]
         return self.get_response(request)
 
 
+WIKIDOT_AUTH_COOKIES = frozenset(('wikidot_token7', 'wikidot_udsession', 'WIKIDOT_SESSION_ID'))
+WIKIDOT_SESSION_COOKIE_PREFIX = 'WIKIDOT_SESSION_ID_'
+
+
 class DropWikidotAuthMiddleware(object):
     """Wikidot认证Cookie清理中间件
     作用：删除所有Wikidot相关的认证Cookie，避免认证冲突
@@ -200,11 +245,8 @@ class DropWikidotAuthMiddleware(object):
         response = self.get_response(request)
         # 遍历所有Cookie，删除Wikidot相关的认证Cookie
         for cookie in request.COOKIES:
-            # 匹配固定名称的Wikidot Cookie
-            if cookie in ['wikidot_token7', 'wikidot_udsession', 'WIKIDOT_SESSION_ID']:
-                response.delete_cookie(cookie, path='/')
-            # 匹配以WIKIDOT_SESSION_ID_开头的Cookie
-            if cookie.startswith('WIKIDOT_SESSION_ID_'):
+            # 匹配固定名称或以WIKIDOT_SESSION_ID_开头的Wikidot Cookie
+            if cookie in WIKIDOT_AUTH_COOKIES or cookie.startswith(WIKIDOT_SESSION_COOKIE_PREFIX):
                 response.delete_cookie(cookie, path='/')
         return response
 
@@ -215,13 +257,18 @@ class SpyRequestMiddleware(object):
     """
     def __init__(self, get_response):
         self.get_response = get_response
+        # 静态/媒体文件请求不会用到这些线程变量
+        self.skipped_path_prefixes = (settings.STATIC_URL, *MEDIA_PATH_PREFIXES)
 
     def __call__(self, request):
+        if request.path.startswith(self.skipped_path_prefixes):
+            return self.get_response(request)
+
         with threadvars.context():
             # 获取客户端真实IP（优先取X-Forwarded-For，兼容反向代理）
             x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
             if x_forwarded_for:
-                ip = x_forwarded_for.split(',')[0]  # 取第一个IP（避免代理层多IP）
+                ip = x_forwarded_for.partition(',')[0]  # 取第一个IP（避免代理层多IP）
             else:
                 ip = request.META.get('REMOTE_ADDR')  # 兜底取远程IP
 
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-15 12:00
+
+import auto_prefetch
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('web', '0068_user_user_email_ci_uniqueness'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='role',
+            index=models.Index(fields=['category', 'is_staff'], name='role_category_is_staff_idx'),
+        ),
+        # the composite index above covers lookups by category alone
+        migrations.RemoveIndex(
+            model_name='role',
+            name='web_role_categor_bd0076_idx',
+        ),
+        migrations.AlterField(
+            model_name='role',
+            name='category',
+            field=auto_prefetch.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, to='web.rolecategory', verbose_name='Категория'),
+        ),
+    ]
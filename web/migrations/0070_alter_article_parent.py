@@ -0,0 +1,20 @@
+# Generated by Django 5.2.8 on 2026-10-15 12:00
+
+import auto_prefetch
+import django.db.models.deletion
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('web', '0069_role_category_is_staff_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='article',
+            name='parent',
+            field=auto_prefetch.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='children', to='web.article', verbose_name='Родитель'),
+        ),
+    ]
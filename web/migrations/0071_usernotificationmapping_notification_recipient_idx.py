@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-15 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('web', '0070_alter_article_parent'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='usernotificationmapping',
+            index=models.Index(fields=['recipient', '-notification'], name='notification_recipient_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-15 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('web', '0071_usernotificationmapping_notification_recipient_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='search_index_stale',
+            field=models.BooleanField(default=False, verbose_name='Поисковый индекс устарел'),
+        ),
+    ]
@@ -152,11 +152,13 @@ class Article(auto_prefetch.Model, PermissionsOverrideMixin):
     )
     title = models.TextField('Заголовок')
 
-    parent = auto_prefetch.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, verbose_name='Родитель')
+    parent = auto_prefetch.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, related_name='children', verbose_name='Родитель')
     tags = models.ManyToManyField(Tag, blank=True, related_name='articles', verbose_name='Тэги')
     authors = models.ManyToManyField(User, blank=False, related_name='authored_by', verbose_name='Авторы')
 
     locked = models.BooleanField('Страница защищена', default=False)
+    # set in the editing transaction, cleared once the search index is rebuilt (see `initsearch --stale`)
+    search_index_stale = models.BooleanField('Поисковый индекс устарел', default=False)
 
     created_at = models.DateTimeField('Время создания', auto_now_add=True)
     updated_at = models.DateTimeField('Время изменения', auto_now_add=True)
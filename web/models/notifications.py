@@ -37,6 +37,9 @@ class UserNotification(auto_prefetch.Model):
 
 
 class UserNotificationMapping(auto_prefetch.Model):
+    class Meta(auto_prefetch.Model.Meta):
+        indexes = [models.Index(fields=['recipient', '-notification'], name='notification_recipient_idx')]
+
     recipient = auto_prefetch.ForeignKey(User, on_delete=models.CASCADE, blank=False, null=False)
     notification = auto_prefetch.ForeignKey(UserNotification, on_delete=models.CASCADE)
     is_viewed = models.BooleanField(blank=False, null=False, default=False)
@@ -49,4 +52,4 @@ class UserNotificationSubscription(auto_prefetch.Model):
 
     subscriber = auto_prefetch.ForeignKey(User, on_delete=models.CASCADE, verbose_name='Подписчик', blank=False, null=False)
     article = auto_prefetch.ForeignKey(Article, on_delete=models.CASCADE, verbose_name='Статья', blank=True, null=True)
-    forum_thread = auto_prefetch.ForeignKey(ForumThread, on_delete=models.CASCADE, verbose_name='Ветка форума', blank=True, null=True)
\ No newline at end of file
+    forum_thread = auto_prefetch.ForeignKey(ForumThread, on_delete=models.CASCADE, verbose_name='Ветка форума', blank=True, null=True)
@@ -70,7 +70,10 @@ class Role(auto_prefetch.Model):
         verbose_name_plural = 'Роли'
 
         ordering = ['index']
-        indexes = [models.Index(fields=['slug']), models.Index(fields=['category'])]
+        indexes = [
+            models.Index(fields=['slug']),
+            models.Index(fields=['category', 'is_staff'], name='role_category_is_staff_idx'),
+        ]
 
     class InlineVisualMode(models.TextChoices):
         Hidden = ('hidden', 'Скрыто')
@@ -85,7 +88,8 @@ class Role(auto_prefetch.Model):
     slug = models.CharField('Идентификатор', unique=True, blank=False, null=False)
     name = models.CharField('Полное название', blank=True)
     short_name = models.CharField('Короткое название', blank=True)
-    category = auto_prefetch.ForeignKey(RoleCategory, verbose_name='Категория', on_delete=models.SET_NULL, blank=True, null=True)
+    # indexed by role_category_is_staff_idx
+    category = auto_prefetch.ForeignKey(RoleCategory, verbose_name='Категория', on_delete=models.SET_NULL, blank=True, null=True, db_index=False)
     index = models.PositiveIntegerField('Приоритет', default=0, editable=False, db_index=True, blank=False, null=False)
 
     is_staff = models.BooleanField('Доступ в админку', default=False, blank=False, null=False)
@@ -362,7 +366,10 @@ class RolePermissionsOverrideMixin(models.Model, PermissionsOverrideMixin):
     def override_role(self, user_obj, perms: set, role=None):
         if not role or not self.pk:
             return perms
-        for perm_override in self.permissions_override.all().filter(role=role):
+        # filtered in Python so that prefetched overrides are reused
+        for perm_override in self.permissions_override.all():
+            if perm_override.role_id != role.id:
+                continue
             for perm in perm_override.permissions.all():
                 codename = f'roles.{perm.codename}'
                 perms.add(codename)
@@ -127,9 +127,9 @@ class UsedToken(auto_prefetch.Model):
 
     @classmethod
     def is_used(cls, token):
-        if cls.objects.filter(token=token, is_case_sensitive=True).exists():
-            return True
-        return cls.objects.filter(token__iexact=token, is_case_sensitive=False).exists()
+        return cls.objects.filter(
+            models.Q(token=token, is_case_sensitive=True) | models.Q(token__iexact=token, is_case_sensitive=False)
+        ).exists()
 
     @classmethod
     def mark_used(cls, token, is_case_sensitive):
@@ -17,13 +17,21 @@ class RolesBackend(BaseBackend):
                 roles_cache.extend(user_obj.roles.all().order_by('-index'))
             user_obj._roles_cache = roles_cache
 
+        role_perms_cache = getattr(user_obj, '_role_perms_cache', None)
+        if role_perms_cache is None:
+            role_perms_cache = []
+            for role in roles_cache:
+                role_perms = {f'roles.{p.codename}' for p in role.permissions.all()}
+                role_restricts = {f'roles.{p.codename}' for p in role.restrictions.all()}
+                role_perms_cache.append((role, role_perms - role_restricts))
+            user_obj._role_perms_cache = role_perms_cache
+
         perms = set()
         has_override = isinstance(obj, PermissionsOverrideMixin)
 
-        for role in roles_cache:
-            role_perms = {f'roles.{p.codename}' for p in role.permissions.all()}
-            role_restricts = {f'roles.{p.codename}' for p in role.restrictions.all()}
-            role_final = role_perms - role_restricts
+        for role, role_perms in role_perms_cache:
+            # overrides modify the set in place, so work on a copy
+            role_final = set(role_perms)
 
             if has_override:
                 role_final = obj.override_role(user_obj, role_final, role)
@@ -37,10 +45,11 @@ class RolesBackend(BaseBackend):
     
     def has_perm(self, user_obj, perm, obj: PermissionsOverrideMixin=None):
         is_cachable = obj is None or (obj.pk if hasattr(obj, 'pk') else (hasattr(obj, '__hash__') and obj.__hash__ is not None))
-        if is_cachable and hasattr(user_obj, '_roles_perms_cache') and (obj, perm) in user_obj._roles_perms_cache:
-            return user_obj._roles_perms_cache[(obj, perm)]
-        else:
+        # the cache lives on the user object, so for request.user it is scoped to a single request
+        if not hasattr(user_obj, '_roles_perms_cache'):
             user_obj._roles_perms_cache = {}
+        if is_cachable and (obj, perm) in user_obj._roles_perms_cache:
+            return user_obj._roles_perms_cache[(obj, perm)]
         all_perms = self.get_all_permissions(user_obj, obj)
         if perm in _ROLE_PERMISSIONS_REPR_CACHE:
             for role_perm in _ROLE_PERMISSIONS_REPR_CACHE[perm]:
@@ -0,0 +1,31 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from web import threadvars
+from web.models.site import Site
+
+
+class SiteTestCase(TestCase):
+    """Test case with a configured site, set as current for the test thread (as MediaHostMiddleware does for requests).
+
+    Test client requests are sent to the site domain: the middleware requires a Host header, which the client does not send by default.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.site = Site.objects.create(
+            slug='test',
+            title='Test',
+            headline='',
+            domain='testserver',
+            media_domain='media.testserver'
+        )
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        context = threadvars.context()
+        context.__enter__()
+        self.addCleanup(context.__exit__, None, None, None)
+        threadvars.put('current_site', self.site)
+        self.client.defaults['HTTP_HOST'] = self.site.domain
@@ -0,0 +1,17 @@
+import json
+
+from django.test import SimpleTestCase
+
+from web.views.api import APIView
+
+
+class RenderJsonTest(SimpleTestCase):
+    def test_lone_surrogate_is_escaped(self):
+        # client-supplied text is echoed back as is (e.g. preview title), it must not break encoding
+        response = APIView().render_json(200, {'title': '\ud800'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content), {'title': '\ud800'})
+
+    def test_output_is_compact(self):
+        response = APIView().render_json(200, {'a': [1, 2], 'b': 'текст'})
+        self.assertEqual(response.content, b'{"a":[1,2],"b":"\\u0442\\u0435\\u043a\\u0441\\u0442"}')
@@ -0,0 +1,57 @@
+from django.contrib.auth import get_user_model
+
+from web.controllers import articles
+from web.models.articles import Category
+from web.models.roles import Role, RolePermissionsOverride
+from web.permissions.articles import MoveArticlesPermission
+from web.tests.base import SiteTestCase
+
+
+User = get_user_model()
+
+
+class RenameArticlePermissionTest(SiteTestCase):
+    """Permission checks of the rename branch in FetchOrUpdateView.put."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = User.objects.create_user(username='mover', password='password')
+        cls.role = Role.objects.create(slug='movers')
+        cls.role.permissions.add(MoveArticlesPermission.as_permission())
+
+        # category with an existing row where movers lose move_articles
+        locked = Category.objects.create(name='locked')
+        override = RolePermissionsOverride.objects.create(role=cls.role)
+        override.restrictions.add(MoveArticlesPermission.as_permission())
+        locked.permissions_override.add(override)
+
+        cls.article = articles.create_article('page', cls.user)
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+
+    def _rename(self, new_name):
+        return self.client.put('/api/articles/page', {'pageId': new_name}, content_type='application/json')
+
+    def _assert_not_renamed(self):
+        self.article.refresh_from_db()
+        self.assertEqual(articles.get_full_name(self.article), 'page')
+
+    def test_no_move_permission_into_category_without_settings(self):
+        # the target category has no Category row, so only the article itself can deny the move
+        response = self._rename('other:page')
+        self.assertEqual(response.status_code, 403)
+        self._assert_not_renamed()
+
+    def test_no_move_permission_into_existing_category(self):
+        response = self._rename('locked:page')
+        self.assertEqual(response.status_code, 403)
+        self._assert_not_renamed()
+
+    def test_move_restricted_in_target_category(self):
+        self.user.roles.add(self.role)
+        response = self._rename('locked:page')
+        self.assertEqual(response.status_code, 403)
+        self._assert_not_renamed()
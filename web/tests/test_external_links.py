@@ -0,0 +1,47 @@
+from web.controllers import articles
+from web.models.articles import Article, ExternalLink
+from web.tests.base import SiteTestCase
+
+
+class GetExternalLinksToTest(SiteTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        Article.objects.create(name='source', title='Source page')
+        Article.objects.create(category='cat', name='other', title='Other page')
+
+        ExternalLink.objects.create(link_from='source', link_to='target', link_type=ExternalLink.Type.Link)
+        ExternalLink.objects.create(link_from='Cat:Other', link_to='target', link_type=ExternalLink.Type.Include)
+        ExternalLink.objects.create(link_from='missing', link_to='target', link_type=ExternalLink.Type.Link)
+        ExternalLink.objects.create(link_from='source', link_to='elsewhere', link_type=ExternalLink.Type.Link)
+
+    def _links_by_source(self, full_name):
+        return {link_from: (link_type, source) for link_from, link_type, source in articles.get_external_links_to(full_name)}
+
+    def test_only_links_to_target(self):
+        links = self._links_by_source('target')
+        self.assertEqual(set(links), {'source', 'cat:other', 'missing'})
+
+    def test_link_types(self):
+        links = self._links_by_source('target')
+        self.assertEqual(links['source'][0], ExternalLink.Type.Link)
+        self.assertEqual(links['cat:other'][0], ExternalLink.Type.Include)
+
+    def test_source_in_default_category(self):
+        source = self._links_by_source('target')['source'][1]
+        self.assertEqual((source.category, source.name, source.title), ('_default', 'source', 'Source page'))
+        self.assertEqual(source.full_name, 'source')
+
+    def test_source_in_category(self):
+        source = self._links_by_source('target')['cat:other'][1]
+        self.assertEqual((source.category, source.name, source.title), ('cat', 'other', 'Other page'))
+        self.assertEqual(source.full_name, 'cat:other')
+
+    def test_missing_source(self):
+        self.assertIsNone(self._links_by_source('target')['missing'][1])
+
+    def test_target_is_case_insensitive(self):
+        self.assertEqual(set(self._links_by_source('Target')), {'source', 'cat:other', 'missing'})
+
+    def test_no_links(self):
+        self.assertEqual(articles.get_external_links_to('nothing'), [])
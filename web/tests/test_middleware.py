@@ -0,0 +1,46 @@
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from web import threadvars
+from web.middleware import MediaHostMiddleware
+from web.tests.base import SiteTestCase
+
+
+class MediaHostMiddlewareTest(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.factory = RequestFactory()
+        self.middleware = MediaHostMiddleware(self._get_response)
+        self.current_site = None
+
+    def _get_response(self, request):
+        self.current_site = threadvars.get('current_site')
+        return HttpResponse()
+
+    def _get(self, host, path='/'):
+        return self.middleware(self.factory.get(path, HTTP_HOST=host))
+
+    def test_resolves_site_by_domain(self):
+        self._get('testserver')
+        self.assertEqual(self.current_site.pk, self.site.pk)
+
+    def test_warm_cache_does_not_query(self):
+        self._get('testserver')
+        with self.assertNumQueries(0):
+            self._get('testserver')
+        self.assertEqual(self.current_site.pk, self.site.pk)
+
+    def test_site_change_invalidates_cache(self):
+        self._get('testserver')
+        self.site.domain = 'renamed.testserver'
+        self.site.save()
+        self._get('renamed.testserver')
+        self.assertEqual(self.current_site.domain, 'renamed.testserver')
+        with self.assertRaises(PermissionDenied):
+            self._get('testserver')
+
+    def test_media_host_redirects_pages(self):
+        response = self._get('media.testserver', '/page')
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response['Location'], '//testserver/page')
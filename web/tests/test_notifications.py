@@ -0,0 +1,58 @@
+from django.contrib.auth import get_user_model
+
+from web.controllers import notifications
+from web.models.notifications import UserNotification, UserNotificationMapping
+from web.tests.base import SiteTestCase
+
+
+User = get_user_model()
+
+
+class GetNotificationsTest(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='reader', password='password')
+        self.other_user = User.objects.create_user(username='other', password='password')
+        self.sent = [
+            notifications.send_user_notification([self.user, self.other_user], UserNotification.NotificationType.Welcome, meta={'n': n})
+            for n in range(7)
+        ]
+        # one notification has been read already and must never show up in unread pages
+        UserNotificationMapping.objects.filter(recipient=self.user, notification=self.sent[3]).update(is_viewed=True)
+
+    def _page_through(self, **kwargs):
+        pages = []
+        cursor = -1
+        while True:
+            page = notifications.get_notifications(self.user, cursor=cursor, limit=2, **kwargs)
+            if not page:
+                return pages
+            pages.append(page)
+            cursor = page[-1][0].id
+
+    def test_unread_pages_mark_viewed_without_skipping_or_repeating(self):
+        pages = self._page_through(unread=True, mark_as_viewed=True)
+
+        seen = [notification.id for page in pages for notification, _ in page]
+        expected = [n.id for n in reversed(self.sent) if n.id != self.sent[3].id]
+        self.assertEqual(seen, expected)
+        self.assertTrue(all(not is_viewed for page in pages for _, is_viewed in page))
+        self.assertFalse(UserNotificationMapping.objects.filter(recipient=self.user, is_viewed=False).exists())
+
+    def test_mark_as_viewed_only_affects_returned_page(self):
+        page = notifications.get_notifications(self.user, limit=2, unread=True, mark_as_viewed=True)
+
+        returned_ids = {notification.id for notification, _ in page}
+        viewed_ids = set(UserNotificationMapping.objects.filter(recipient=self.user, is_viewed=True).values_list('notification_id', flat=True))
+        self.assertEqual(viewed_ids, returned_ids | {self.sent[3].id})
+
+    def test_other_recipients_are_untouched(self):
+        self._page_through(unread=True, mark_as_viewed=True)
+
+        self.assertFalse(UserNotificationMapping.objects.filter(recipient=self.other_user, is_viewed=True).exists())
+
+    def test_all_notifications_keep_viewed_state(self):
+        pages = self._page_through(unread=False)
+
+        result = [(notification.id, is_viewed) for page in pages for notification, is_viewed in page]
+        self.assertEqual(result, [(n.id, n.id == self.sent[3].id) for n in reversed(self.sent)])
@@ -0,0 +1,56 @@
+from django.contrib.admin.models import LogEntry, CHANGE
+from django.contrib.auth import get_user_model
+
+from web.models.articles import Article, Vote
+from web.tests.base import SiteTestCase
+
+
+User = get_user_model()
+
+
+class ResetUserVotesViewTest(SiteTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.admin = User.objects.create_superuser(username='admin', password='password')
+        cls.voter = User.objects.create_user(username='voter', password='password')
+        cls.other = User.objects.create_user(username='other', password='password')
+
+        first = Article.objects.create(name='first', title='First')
+        second = Article.objects.create(name='second', title='Second')
+        Vote.objects.create(article=first, user=cls.voter, rate=1)
+        Vote.objects.create(article=second, user=cls.voter, rate=-1)
+        Vote.objects.create(article=first, user=cls.other, rate=1)
+
+    def _reset(self, user_id):
+        return self.client.post(f'/-/admin/web/user/{user_id}/reset_votes/')
+
+    def test_deletes_only_user_votes(self):
+        self.client.force_login(self.admin)
+        response = self._reset(self.voter.pk)
+        self.assertRedirects(response, '/-/admin/', fetch_redirect_response=False)
+        self.assertFalse(Vote.objects.filter(user=self.voter).exists())
+        self.assertEqual(Vote.objects.filter(user=self.other).count(), 1)
+
+    def test_logs_action(self):
+        self.client.force_login(self.admin)
+        self._reset(self.voter.pk)
+        entry = LogEntry.objects.get()
+        self.assertEqual(entry.user_id, self.admin.pk)
+        self.assertEqual(entry.object_id, str(self.voter.pk))
+        self.assertEqual(entry.action_flag, CHANGE)
+
+    def test_missing_user(self):
+        self.client.force_login(self.admin)
+        response = self._reset(self.other.pk + 1000)
+        self.assertRedirects(response, '/-/admin/', fetch_redirect_response=False)
+        self.assertEqual(Vote.objects.count(), 3)
+        self.assertFalse(LogEntry.objects.exists())
+
+    def test_requires_staff(self):
+        self.client.force_login(self.other)
+        response = self._reset(self.voter.pk)
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response.url.startswith('/-/admin/login/'))
+        self.assertEqual(Vote.objects.filter(user=self.voter).count(), 2)
+        self.assertFalse(LogEntry.objects.exists())
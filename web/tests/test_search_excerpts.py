@@ -0,0 +1,42 @@
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase
+
+from web.views.api.search import SearchView
+
+
+class GetExcerptsTest(SimpleTestCase):
+    @staticmethod
+    def _excerpts(body, words):
+        result = {'article': SimpleNamespace(content_plaintext='Title\n\n' + body, content_source=''), 'words': words}
+        return SearchView.get_excerpts(result, is_source=False)
+
+    def test_separate_matches_give_separate_excerpts(self):
+        body = 'a' * 40 + 'alpha' + 'c' * 100 + 'beta' + 'd' * 40
+        self.assertEqual(self._excerpts(body, ['alpha', 'beta']), [body[10:75], body[115:179]])
+
+    def test_overlapping_ranges_are_merged(self):
+        body = 'a' * 40 + 'alpha' + 'c' * 20 + 'gamma' + 'a' * 40
+        self.assertEqual(self._excerpts(body, ['alpha', 'gamma']), [body[10:100]])
+
+    def test_nested_range_does_not_truncate_merged_excerpt(self):
+        # "eed" inside "needle" ends earlier than the "needle" range; the merged excerpt keeps the furthest end
+        body = 'a' * 40 + 'needle' + 'b' * 40
+        self.assertEqual(self._excerpts(body, ['needle', 'eed']), [body[10:76]])
+
+    def test_matching_is_case_insensitive_and_keeps_original_case(self):
+        body = 'a' * 40 + 'NeEdLe' + 'b' * 40
+        self.assertEqual(self._excerpts(body, ['needle']), [body[10:76]])
+
+    def test_short_words_are_ignored_when_long_words_exist(self):
+        body = 'in' + 'x' * 100 + 'needle' + 'y' * 40
+        self.assertEqual(self._excerpts(body, ['in', 'needle']), [body[72:138]])
+
+    def test_total_length_is_capped(self):
+        body = ''.join('w' * 100 + 'needle' for _ in range(30))
+        excerpts = self._excerpts(body, ['needle'])
+        self.assertEqual(len(excerpts), 15)
+        self.assertTrue(all(len(excerpt) == 66 for excerpt in excerpts))
+
+    def test_no_words_no_excerpts(self):
+        self.assertEqual(self._excerpts('text', []), [])
@@ -0,0 +1,53 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+
+from web.controllers import articles, search
+from web.models import ArticleSearchIndex
+from web.tests.base import SiteTestCase
+
+
+User = get_user_model()
+
+
+# keeps the background worker from starting; tests drain the queue themselves
+@mock.patch.object(search, '_search_index_worker', object())
+class ScheduleSearchIndexUpdateTest(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        user = User.objects.create_user(username='editor', password='password')
+        self.article = articles.create_article('page', user)
+        articles.create_article_version(self.article, 'first version', user)
+        self.addCleanup(search._search_index_queue.clear)
+
+    def _schedule(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            search.schedule_search_index_update(self.article)
+
+    def _is_stale(self):
+        self.article.refresh_from_db(fields=['search_index_stale'])
+        return self.article.search_index_stale
+
+    def test_scheduled_update_is_flushed(self):
+        self._schedule()
+        self.assertTrue(self._is_stale())
+        self.assertFalse(ArticleSearchIndex.objects.filter(article=self.article).exists())
+
+        search.flush_search_index_updates()
+
+        index = ArticleSearchIndex.objects.get(article=self.article)
+        self.assertEqual(index.content_source, 'page\n\nfirst version')
+        self.assertFalse(self._is_stale())
+        self.assertEqual(search._search_index_queue, {})
+
+    def test_updates_are_coalesced(self):
+        self._schedule()
+        self._schedule()
+        self.assertEqual(list(search._search_index_queue), [self.article.id])
+
+    def test_failed_update_stays_stale(self):
+        self._schedule()
+        with mock.patch.object(search, 'update_search_index', side_effect=RuntimeError), self.assertLogs(level='ERROR'):
+            search.flush_search_index_updates()
+        self.assertTrue(self._is_stale())
+        self.assertEqual(search._search_index_queue, {})
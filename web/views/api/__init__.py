@@ -8,6 +8,11 @@ from django.views.generic import View
 from django.http import JsonResponse, HttpRequest
 
 
+# Compact separators keep large payloads like search excerpts smaller.
+# ensure_ascii stays on: client-supplied text (e.g. preview titles) may contain lone surrogates, which can't be encoded as UTF-8.
+JSON_DUMPS_PARAMS = {'separators': (',', ':')}
+
+
 class APIError(Exception):
     def __init__(self, message, code=500, *args):
         super().__init__(*args)
@@ -35,7 +40,7 @@ class APIView(View):
         return self.render_error(405, 'Некорректный метод запроса')
 
     def render_json(self, code, o):
-        return JsonResponse(o, status=code, safe=False)
+        return JsonResponse(o, status=code, safe=False, json_dumps_params=JSON_DUMPS_PARAMS)
 
     def render_error(self, code, error):
         return self.render_json(code, {'error': error})
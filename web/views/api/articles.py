@@ -1,5 +1,6 @@
 import logging
 from django.conf import settings
+from django.db import transaction
 from django.http import HttpRequest, HttpResponse
 
 from modules.sitechanges import log_entry_default_comment
@@ -14,7 +15,7 @@ from renderer.parser import RenderContext
 
 import json
 
-from web.controllers.search import update_search_index
+from web.controllers.search import schedule_search_index_update
 from web.models.articles import Category, ExternalLink, Article
 
 from modules import rate, ModuleError
@@ -102,21 +103,23 @@ class FetchOrUpdateView(ArticleView):
     """文章查询/更新API视图"""
     def get(self, request: HttpRequest, full_name: str) -> HttpResponse:
         """获取单篇文章详情"""
-        # 检查查看权限
-        category = articles.get_article_category(full_name)
+        # 查询文章及分类，检查查看权限
+        article, category = articles.get_article_and_category(full_name)
         if not request.user.has_perm('roles.view_articles', category):
             raise APIError('权限不足', 403)
-        # 查询文章
-        article = articles.get_article(full_name)
         if article is None:
             raise APIError('页面不存在', 404)
 
         return self.render_article(article)
 
-    def render_article(self, article: Article):
-        """格式化文章数据为API响应格式"""
-        source = articles.get_latest_source(article)
-        authors = [render_user_to_json(author) for author in article.authors.all()]
+    def render_article(self, article: Article, source: str | None = None):
+        """格式化文章数据为API响应格式
+        :param source: 已知的最新源码（未传递时从数据库查询）
+        """
+        if source is None:
+            source = articles.get_latest_source(article)
+        # 预加载作者角色（is_staff和角色列表都会读取）
+        authors = [render_user_to_json(author) for author in article.authors.prefetch_related('roles')]
 
         return self.render_json(200, {
             'uid': article.id,
@@ -131,17 +134,20 @@ class FetchOrUpdateView(ArticleView):
         })
 
     @takes_json
+    @transaction.atomic
     def put(self, request: HttpRequest, full_name: str) -> HttpResponse:
         """更新文章信息（支持重命名、修改标题/源码/标签/父级/锁定状态/作者）"""
         # 查询文章
-        article = articles.get_article(full_name)
+        article, category = articles.get_article_and_category(full_name)
         if article is None:
             # 即使文章不存在，也需验证查看权限（防止枚举）
-            category = articles.get_article_category(full_name)
             if not request.user.has_perm('roles.view_articles', category):
                 raise APIError('权限不足', 403)
             raise APIError('页面不存在', 404)
 
+        # 锁定文章行并重新读取，避免并发修改之间的竞争；任一步骤失败时整体回滚
+        article.refresh_from_db(from_queryset=Article.objects.select_for_update())
+
         # 检查文章编辑权限
         can_edit_articles = request.user.has_perm('roles.edit_articles', article)
 
@@ -153,9 +159,10 @@ class FetchOrUpdateView(ArticleView):
         if data['pageId'] != full_name:
             new_name = articles.normalize_article_name(data['pageId'])
             new_category = articles.get_article_category(new_name)
-            # 检查移动/重命名权限
-            if not request.user.has_perm('roles.move_articles', article) or \
-               not request.user.has_perm('roles.move_articles', new_category) if new_category else False:
+            # 检查移动/重命名权限（目标分类已存在时还需检查目标分类的权限）
+            if not request.user.has_perm('roles.move_articles', article):
+                raise APIError('权限不足', 403)
+            if new_category and not request.user.has_perm('roles.move_articles', new_category):
                 raise APIError('权限不足', 403)
             # 检查新名称是否已存在
             article2 = articles.get_article(new_name)
@@ -172,12 +179,14 @@ class FetchOrUpdateView(ArticleView):
             articles.update_title(article, data['title'], request.user)
 
         # 3. 处理源码修改
-        if 'source' in data and data['source'] != articles.get_latest_source(article):
+        latest_source = articles.get_latest_source(article)
+        if 'source' in data and data['source'] != latest_source:
             if not can_edit_articles:
                 raise APIError('权限不足', 403)
             # 创建新版本记录
             version = articles.create_article_version(article, data['source'], request.user, data.get('comment', ''))
             articles.refresh_article_links(version)
+            latest_source = version.source
 
         # 4. 处理标签修改
         if 'tags' in data:
@@ -202,26 +211,26 @@ class FetchOrUpdateView(ArticleView):
         # 7. 处理作者修改
         if 'authorsIds' in data:
             # 验证作者ID格式（列表且元素为字符串）
-            if isinstance(data['authorsIds'], list) and all(map(lambda a: isinstance(a, str), data['authorsIds'])):
+            authors_ids = data['authorsIds']
+            if isinstance(authors_ids, list) and not any(type(a) is not str for a in authors_ids):
                 if can_edit_articles and request.user.has_perm('roles.manage_article_authors', article):
-                    articles.set_authors(article, data['authorsIds'], request.user)
+                    articles.set_authors(article, authors_ids, request.user)
                 else:
                     raise APIError('权限不足', 403)
             else:
                 raise APIError('作者ID格式无效', 400)
 
-        # 刷新数据库数据，更新搜索索引
-        article.refresh_from_db()
-        update_search_index(article)
-        return self.render_article(article)
+        # 刷新数据库数据（仅响应和搜索索引需要的字段），后台更新搜索索引
+        article.refresh_from_db(fields=['category', 'name', 'title', 'locked', 'parent'])
+        schedule_search_index_update(article)
+        return self.render_article(article, source=latest_source)
 
     def delete(self, request: HttpRequest, full_name: str) -> HttpResponse:
         """删除文章"""
         # 查询文章
-        article = articles.get_article(full_name)
+        article, category = articles.get_article_and_category(full_name)
         if article is None:
             # 验证查看权限（防止枚举）
-            category = articles.get_article_category(full_name)
             if not request.user.has_perm('roles.view_articles', category):
                 raise APIError('权限不足', 403)
             raise APIError('页面不存在', 404)
@@ -256,12 +265,15 @@ class FetchOrRevertLogView(APIView):
         # 获取分页日志和总数量
         log_entries, total_count = articles.get_log_entries_paged(full_name, c_from, c_to, get_all)
 
-        # 格式化日志数据
+        # 格式化日志数据（同一用户只渲染一次）
         output = []
+        rendered_users = {}
         for entry in log_entries:
+            if entry.user_id not in rendered_users:
+                rendered_users[entry.user_id] = render_user_to_json(entry.user)
             output.append({
                 'revNumber': entry.rev_number,
-                'user': render_user_to_json(entry.user),
+                'user': rendered_users[entry.user_id],
                 'comment': entry.comment,
                 'defaultComment': log_entry_default_comment(entry),
                 'createdAt': entry.created_at.isoformat(),
@@ -275,10 +287,9 @@ class FetchOrRevertLogView(APIView):
     def put(self, request: HttpRequest, full_name: str) -> HttpResponse:
         """回滚文章到指定版本"""
         # 查询文章
-        article = articles.get_article(full_name)
+        article, category = articles.get_article_and_category(full_name)
         if article is None:
             # 验证查看权限
-            category = articles.get_article_category(full_name)
             if not request.user.has_perm('roles.view_articles', category):
                 raise APIError('权限不足', 403)
             raise APIError('页面不存在', 404)
@@ -295,12 +306,12 @@ class FetchOrRevertLogView(APIView):
 
         # 执行版本回滚
         articles.revert_article_version(article, data["revNumber"], request.user)
-        # 刷新链接关系，更新搜索索引
+        # 刷新链接关系，后台更新搜索索引
         version = articles.get_latest_version(article)
         articles.refresh_article_links(version)
 
-        article.refresh_from_db()
-        update_search_index(article)
+        article.refresh_from_db(fields=['category', 'name', 'title'])
+        schedule_search_index_update(article)
         return self.render_json(200, {"pageId": article.full_name})
 
 
@@ -308,13 +319,12 @@ class FetchVersionView(APIView):
     """文章指定版本查询API视图"""
     def get(self, request: HttpRequest, full_name: str) -> HttpResponse:
         """获取文章指定版本的源码和渲染结果"""
-        # 检查查看权限
-        category = articles.get_article_category(full_name)
+        # 查询文章及分类，检查查看权限
+        article, category = articles.get_article_and_category(full_name)
         if not request.user.has_perm('roles.view_articles', category):
             raise APIError('权限不足', 403)
         
-        # 查询文章和指定版本源码
-        article = articles.get_article(full_name)
+        # 查询指定版本源码
         source = articles.get_source_at_rev_num(article, int(request.GET.get('revNum')))
 
         # 渲染并返回结果
@@ -332,37 +342,31 @@ class FetchExternalLinks(APIView):
     作用：获取文章的子文章、包含链接、普通链接
     """
     def get(self, request: HttpRequest, full_name: str) -> HttpResponse:
-        # 检查查看权限
-        category = articles.get_article_category(full_name)
+        # 查询文章及分类，检查查看权限
+        article, category = articles.get_article_and_category(full_name)
         if not request.user.has_perm('roles.view_articles', category):
             raise APIError('权限不足', 403)
         
-        # 查询文章
-        article = articles.get_article(full_name)
         if not article:
             raise APIError('页面不存在', 404)
 
         # 1. 获取子文章列表
         links_children = [{'id': x.full_name, 'title': x.title, 'exists': True} for x in
-                          Article.objects.filter(parent=article)]
+                          article.children.only('category', 'name', 'title')]
 
-        # 2. 获取所有指向当前文章的外部链接
-        links_all = ExternalLink.objects.filter(link_to=full_name)
+        # 2. 获取所有指向当前文章的外部链接及其来源文章（单次查询）
+        links_all = articles.get_external_links_to(full_name)
 
         links_include = []  # 包含类型链接
         links_links = []    # 普通链接
 
-        # 批量查询链接来源文章
-        articles_dict = articles.fetch_articles_by_names([link.link_from.lower() for link in links_all])
-
         # 格式化链接数据
-        for link in links_all:
-            article = articles_dict.get(link.link_from.lower())
+        for link_from, link_type, article in links_all:
             article_record = {'id': article.full_name, 'title': article.title, 'exists': True} if article else {
-                'id': link.link_from.lower(), 'title': link.link_from.lower(), 'exists': False}
-            if link.link_type == ExternalLink.Type.Include:
+                'id': link_from, 'title': link_from, 'exists': False}
+            if link_type == ExternalLink.Type.Include:
                 links_include.append(article_record)
-            elif link.link_type == ExternalLink.Type.Link:
+            elif link_type == ExternalLink.Type.Link:
                 links_links.append(article_record)
 
         return self.render_json(200, {'children': links_children, 'includes': links_include, 'links': links_links})
@@ -371,17 +375,18 @@ class FetchOrUpdateVotesView(APIView):
     """文章投票查询/重置API视图"""
     def get(self, request: HttpRequest, full_name: str) -> HttpResponse:
         """获取文章投票数据"""
-        # 检查查看权限
-        category = articles.get_article_category(full_name)
+        # 查询文章及分类，检查查看权限
+        article, category = articles.get_article_and_category(full_name)
         if not request.user.has_perm('roles.view_articles', category):
             raise APIError('权限不足', 403)
         
-        # 查询文章
-        article = articles.get_article(full_name)
         if not article:
             raise APIError('页面不存在', 404)
 
-        # 获取投票数据（处理模块异常）
+        return self._render_votes(request, article)
+
+    def _render_votes(self, request: HttpRequest, article: Article) -> HttpResponse:
+        """获取投票数据（处理模块异常）"""
         try:
             return self.render_json(200, rate.api_get_votes(RenderContext(article=article, source_article=article, user=request.user), {}))
         except ModuleError as e:
@@ -390,10 +395,9 @@ class FetchOrUpdateVotesView(APIView):
     def delete(self, request: HttpRequest, full_name: str) -> HttpResponse:
         """重置文章投票数据"""
         # 查询文章
-        article = articles.get_article(full_name)
+        article, category = articles.get_article_and_category(full_name)
         if article is None:
             # 验证查看权限
-            category = articles.get_article_category(full_name)
             if not request.user.has_perm('roles.view_articles', category):
                 raise APIError('权限不足', 403)
             raise APIError('页面不存在', 404)
@@ -405,5 +409,5 @@ class FetchOrUpdateVotesView(APIView):
         # 执行投票重置
         articles.delete_article_votes(article, user=request.user)
 
-        # 返回最新投票数据
-        return self.get(request, full_name)
+        # 返回最新投票数据（已加载的文章和权限无需重复查询）
+        return self._render_votes(request, article)
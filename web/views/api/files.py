@@ -75,10 +75,27 @@ class GetOrUploadView(FileView):
         }
         return self.render_json(200, data)
 
+    @staticmethod
+    def _get_upload_size_budget():
+        """计算本次上传允许的最大字节数（取软限制/硬限制剩余空间的较小值，未设置限制时为无穷大）"""
+        current_files_size, absolute_files_size = articles.get_file_space_usage()
+        soft_remaining = settings.MEDIA_UPLOAD_LIMIT - current_files_size if settings.MEDIA_UPLOAD_LIMIT > 0 else float('inf')
+        hard_remaining = settings.ABSOLUTE_MEDIA_UPLOAD_LIMIT - absolute_files_size if settings.ABSOLUTE_MEDIA_UPLOAD_LIMIT > 0 else float('inf')
+        return min(soft_remaining, hard_remaining)
+
     def post(self, request: HttpRequest, article_name):
         """上传文件到指定文章"""
         # 验证文章存在性及文件管理权限
         article = self._validate_request(request, article_name)
+
+        # 根据声明的Content-Length提前拒绝超出限制的上传（分块检查仍作为兜底）
+        max_size = self._get_upload_size_budget()
+        try:
+            content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            content_length = 0
+        if content_length > max_size:
+            raise APIError('文件上传大小超出限制', 413)
         
         # 1. 获取并验证文件名
         file_name = request.headers.get('x-file-name')
@@ -108,18 +125,16 @@ class GetOrUploadView(FileView):
             os.makedirs(local_media_dir, exist_ok=True)
         
         # 4. 读取并保存文件（分块上传，实时检查大小限制）
-        current_files_size, absolute_files_size = articles.get_file_space_usage()
         try:
             size = 0
             with open(new_file.local_media_path, 'wb') as f:
                 while True:
-                    # 分块读取（每块100KB）
-                    chunk = request.read(102400)
+                    # 分块读取（每块1MB）
+                    chunk = request.read(1048576)
                     size += len(chunk)
                     
                     # 检查文件大小限制（软限制/硬限制）
-                    if (settings.MEDIA_UPLOAD_LIMIT > 0 and current_files_size + size > settings.MEDIA_UPLOAD_LIMIT) or \
-                            (settings.ABSOLUTE_MEDIA_UPLOAD_LIMIT > 0 and absolute_files_size + size > settings.ABSOLUTE_MEDIA_UPLOAD_LIMIT):
+                    if size > max_size:
                         raise APIError('文件上传大小超出限制', 413)
                     
                     # 读取完毕退出循环
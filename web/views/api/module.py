@@ -8,6 +8,13 @@ from renderer.parser import RenderContext
 from . import APIView, takes_json, APIError
 
 
+def _lower_keys(d: dict) -> dict:
+    """将字典的key转为小写（已全部为小写时直接返回原字典）"""
+    if all(key == key.lower() for key in d):
+        return d
+    return {key.lower(): value for (key, value) in d.items()}
+
+
 class ModuleView(APIView):
     """模块调用API视图
     作用：处理前端发起的模块渲染/API调用请求，支持参数标准化、CSRF校验、异常处理
@@ -34,8 +41,8 @@ class ModuleView(APIView):
         method = data.get('method', None)       # 调用方法（render/其他API方法）
         
         # 参数key小写化，保证参数传递的一致性
-        params = {key.lower(): value for (key, value) in params.items()}
-        path_params = {key.lower(): value for (key, value) in path_params.items()}
+        params = _lower_keys(params)
+        path_params = _lower_keys(path_params)
         
         # 2. 加载关联文章并创建渲染上下文
         article = articles.get_article(page_id)
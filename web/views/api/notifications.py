@@ -1,6 +1,6 @@
 from django.http import HttpRequest
 
-from renderer import single_pass_render
+from renderer import single_pass_render_many
 from renderer.parser import RenderContext
 from web.controllers import articles, notifications
 from web.models.forum import ForumThread
@@ -8,50 +8,30 @@ from web.models.notifications import UserNotification
 from web.views.api import APIError, APIView, takes_json, takes_url_params
 
 
+# 需要渲染消息内容的论坛相关通知类型
+FORUM_NOTIFICATION_TYPES = frozenset({
+    UserNotification.NotificationType.NewThreadPost,  # 新帖子
+    UserNotification.NotificationType.NewPostReply,   # 新回复
+    UserNotification.NotificationType.ForumMention    # 论坛@提及
+})
+
+
 class NotificationsView(APIView):
     """通知列表API视图
     作用：查询用户的通知列表，支持分页、筛选未读、标记已读，渲染通知内容
     """
-    @staticmethod
-    def _replace_params(text: str, params: dict):
-        """替换文本中的参数占位符
-        :param text: 包含%%参数名%%占位符的文本
-        :param params: 参数键值对
-        :return: 替换后的文本
-        """
-        for param, value in params.items():
-            text = text.replace(f'%%{param}%%', str(value))
-        return text
-
-    def render_notification(self, notification: UserNotification, is_viewed: bool, render_context: RenderContext):
-        """格式化通知数据为API响应格式
+    def render_notification(self, notification: UserNotification, is_viewed: bool):
+        """格式化通知数据为API响应格式（论坛通知的消息内容由get批量渲染）
         :param notification: 用户通知对象
         :param is_viewed: 是否已读
-        :param render_context: 渲染上下文
         :return: 格式化后的通知字典
         """
         # 基础通知数据（ID、类型、创建时间、已读状态 + 元数据）
-        base_notification = dict(**{
-            'id': notification.id,
-            'type': notification.type,
-            'created_at': notification.created_at.isoformat(),
-            'is_viewed': is_viewed,
-        }, **notification.meta)
-
-        # 对论坛相关通知渲染消息内容
-        forum_notification_types = [
-            UserNotification.NotificationType.NewThreadPost,  # 新帖子
-            UserNotification.NotificationType.NewPostReply,   # 新回复
-            UserNotification.NotificationType.ForumMention    # 论坛@提及
-        ]
-        if notification.type in forum_notification_types:
-            # 渲染通知消息内容（使用单遍渲染模式）
-            base_notification['message'] = single_pass_render(
-                base_notification['message_source'], 
-                render_context, 
-                mode='message'
-            ),
-
+        base_notification = notification.meta.copy()
+        base_notification['id'] = notification.id
+        base_notification['type'] = notification.type
+        base_notification['created_at'] = notification.created_at.isoformat()
+        base_notification['is_viewed'] = is_viewed
         return base_notification
 
     @takes_url_params
@@ -75,9 +55,23 @@ class NotificationsView(APIView):
             mark_as_viewed=mark_as_viewed
         )
 
-        # 格式化每条通知数据
+        # 格式化每条通知数据，收集需要渲染消息内容的论坛相关通知
+        forum_notifications = []
         for notification, is_viewed in notifications_batch:
-            all_notifications.append(self.render_notification(notification, is_viewed, render_context))
+            base_notification = self.render_notification(notification, is_viewed)
+            if notification.type in FORUM_NOTIFICATION_TYPES:
+                forum_notifications.append(base_notification)
+            all_notifications.append(base_notification)
+
+        # 使用同一渲染上下文一次性渲染所有论坛通知的消息内容（单遍渲染模式）
+        if forum_notifications:
+            messages = single_pass_render_many(
+                [n['message_source'] for n in forum_notifications],
+                render_context,
+                mode='message'
+            )
+            for base_notification, message in zip(forum_notifications, messages):
+                base_notification['message'] = message
         
         # 构造分页响应（返回下一页游标和通知列表）
         next_cursor = all_notifications[-1]['id'] if all_notifications else -1
@@ -106,7 +100,8 @@ class NotificationsSubscribeView(APIView):
             args.update({'article': article})
         # 订阅论坛帖子通知
         elif thread_id:
-            forum_thread = ForumThread.objects.filter(id=thread_id).first()
+            # 只加载订阅和权限检查需要的字段，不读取名称/描述等文本字段
+            forum_thread = ForumThread.objects.only('id', 'is_locked', 'author', 'article', 'category').filter(id=thread_id).first()
             args.update({'forum_thread': forum_thread})
         # 无有效参数
         else:
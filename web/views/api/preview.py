@@ -23,13 +23,15 @@ class PreviewView(APIView):
         """验证预览请求的参数合法性
         :raise APIError: 参数无效时抛出异常
         """
-        if not self.json_input:
+        data = self.json_input
+        if not data or not isinstance(data, dict):
             raise APIError('无效的请求参数', 400)
         # 验证页面ID格式
-        if 'pageId' not in self.json_input or not self.json_input['pageId'] or not articles.is_full_name_allowed(self.json_input['pageId']):
+        page_id = data.get('pageId')
+        if not page_id or not articles.is_full_name_allowed(page_id):
             raise APIError('无效的页面ID', 400)
         # 验证源码字段
-        if 'source' not in self.json_input:
+        if 'source' not in data:
             raise APIError('缺少页面源码内容', 400)
 
     @takes_json
@@ -55,19 +57,18 @@ class PreviewView(APIView):
         template_source = '%%content%%'
         # 非模板文章时，尝试加载分类下的_template文章作为模板
         if article is not None and article.name != '_template':
-            template = articles.get_article(f'{article.category}:_template')
-            if template:
-                template_source = articles.get_latest_source(template)
+            template_source = articles.get_category_template_source(article.category) or template_source
 
         # 5. 构建规范URL（包含路径参数）
         site = get_current_site()
-        encoded_params = ''
+        encoded_parts = []
         # 拼接URL编码的路径参数
-        for param in path_params:
-            encoded_params += f'/{param}'
-            if path_params[param] is not None:
+        for param, value in path_params.items():
+            encoded_parts.append(f'/{param}')
+            if value is not None:
                 # 对参数值进行URL编码（保留安全字符）
-                encoded_params += f"/{urllib.parse.quote(path_params[param], safe='')}"
+                encoded_parts.append(f"/{urllib.parse.quote(value, safe='')}")
+        encoded_params = ''.join(encoded_parts)
         # 拼接完整规范URL（//域名/文章全名/参数）
         canonical_url = f'//{site.domain}/{article.full_name if article else data["pageId"]}{encoded_params}'
 
@@ -1,9 +1,13 @@
+import re
+
+from django.db.models import Prefetch, prefetch_related_objects
 from django.http import HttpRequest
 
 from renderer.utils import render_user_to_json
 from . import APIView
 
 from web.controllers import search, articles
+from web.models.articles import Tag
 
 
 class SearchView(APIView):
@@ -41,12 +45,16 @@ class SearchView(APIView):
             limit=limit
         )
         
+        # 批量加载作者、标签和评分，避免逐条查询
+        found_articles = [result['article'].article for result in results]
+        prefetch_related_objects(found_articles, 'authors__roles', Prefetch('tags', queryset=Tag.objects.select_related('category')))
+        ratings = articles.get_ratings_for(found_articles)
+
         # 格式化搜索结果
         output_results = []
-        for result in results:
-            article = result['article'].article
+        for result, article in zip(results, found_articles):
             # 获取文章评分数据
-            rating, votes, popularity, mode = articles.get_rating(article)
+            rating, votes, popularity, mode = ratings[article.id]
             # 格式化作者信息
             authors = [render_user_to_json(author) for author in article.authors.all()]
             
@@ -64,7 +72,7 @@ class SearchView(APIView):
                     'popularity': popularity,
                     'mode': str(mode)
                 },
-                'tags': articles.get_tags(article),
+                'tags': sorted(tag.full_name.lower() for tag in article.tags.all()),
                 'words': result['words'],          # 匹配的关键词列表
                 'excerpts': self.get_excerpts(result, search_mode == 'source')  # 搜索摘要
             })
@@ -89,7 +97,6 @@ class SearchView(APIView):
         if len(original) < 2:
             return []
         original = original[1]
-        original_to_search = original.lower()  # 转为小写用于匹配
         
         # 2. 整理要匹配的关键词（去重，按长度倒序排列）
         words_to_search = list(sorted({x.lower() for x in result['words']}, key=lambda x: len(x), reverse=True))
@@ -99,66 +106,55 @@ class SearchView(APIView):
         offset = 30                  # 关键词前后偏移字符数
         word_length_cutoff = 2       # 最小关键词长度阈值
         # 判断是否存在长关键词（长度>2）
-        has_long_words = bool([x for x in words_to_search if len(x) > word_length_cutoff])
+        has_long_words = any(len(x) > word_length_cutoff for x in words_to_search)
         
         # 4. 查找所有关键词的位置并生成摘要区间
-        for word in words_to_search:
-            # 有长关键词时，忽略短关键词（避免无意义的"in"/"with"等）
-            if has_long_words and len(word) <= word_length_cutoff:
-                continue
-            # 查找关键词在文本中的所有位置
-            word_positions = cls.findall(word, original_to_search)
-            for position in word_positions:
-                # 计算关键词的起止位置，并扩展偏移量
-                word_start = position
-                word_end = len(word) + word_start
-                word_start = max(0, word_start - offset)    # 避免越界
-                word_end = min(len(original_to_search), word_end + offset)
-                # 存储（关键词长度, 起始位置, 结束位置）
-                ranges.append((len(word), word_start, word_end))
+        # 有长关键词时，忽略短关键词（避免无意义的"in"/"with"等）
+        if has_long_words:
+            words_to_search = [x for x in words_to_search if len(x) > word_length_cutoff]
+        # 没有关键词时无需复制并转换全文
+        if not words_to_search:
+            return []
+        original_to_search = original.lower()  # 转为小写用于匹配
+        original_length = len(original_to_search)
+        # 所有关键词合并为一个正则，只扫描一遍文本；使用前瞻以保留重叠的匹配，
+        # 同一位置按长度倒序优先匹配长关键词（较短的匹配会在第5步合并区间时被覆盖）
+        words_regex = re.compile('(?=(%s))' % '|'.join(re.escape(x) for x in words_to_search))
+        for match in words_regex.finditer(original_to_search):
+            # 计算关键词的起止位置，并扩展偏移量
+            word_start, word_end = match.span(1)
+            word_length = word_end - word_start
+            word_start = max(0, word_start - offset)    # 避免越界
+            word_end = min(original_length, word_end + offset)
+            # 存储（关键词长度, 起始位置, 结束位置）
+            ranges.append((word_length, word_start, word_end))
         
-        # 5. 合并重叠的摘要区间
+        # 5. 合并重叠的摘要区间（单次线性遍历，构建新列表）
         ranges.sort(key=lambda x: x[1])  # 按起始位置排序
-        i = 0
-        while i < len(ranges) - 1:
-            if ranges[i+1][1] < ranges[i][2]:
-                # 区间重叠：合并区间，删除下一个区间
-                ranges[i] = (max(ranges[i][0], ranges[i+1][0]), ranges[i][1], ranges[i+1][2])
-                del ranges[i+1]
-                continue
-            i += 1
+        merged_ranges = []
+        for word_length, range_start, range_end in ranges:
+            if merged_ranges and range_start < merged_ranges[-1][2]:
+                # 区间重叠：合并到上一个区间
+                last_length, last_start, last_end = merged_ranges[-1]
+                merged_ranges[-1] = (max(last_length, word_length), last_start, max(last_end, range_end))
+            else:
+                merged_ranges.append((word_length, range_start, range_end))
+        ranges = merged_ranges
         
         # 6. 排序并限制摘要数量（优先长关键词，最多25条）
         # 按关键词长度降序、起始位置升序排序
         ranges.sort(key=lambda x: (-x[0], x[1]), reverse=False)
         ranges = ranges[:25]
         
-        # 7. 提取摘要文本
-        excerpts = []
-        for _, excerpt_start, excerpt_end in ranges:
-            excerpts.append(original[excerpt_start:excerpt_end])
-        
-        # 8. 限制返回的摘要总长度（避免数据过大）
+        # 7. 提取摘要文本，同时限制返回的摘要总长度（避免数据过大）
+        # 长度按区间计算，超出上限时停止，不再截取会被丢弃的摘要
         max_excerpt_len = 1024
         combined_len = 0
-        for i in range(len(excerpts)):
-            combined_len += len(excerpts[i])
+        excerpts = []
+        for _, excerpt_start, excerpt_end in ranges:
+            combined_len += excerpt_end - excerpt_start
             if combined_len > max_excerpt_len:
-                return excerpts[:i]
+                break
+            excerpts.append(original[excerpt_start:excerpt_end])
         
         return excerpts
-
-    @classmethod
-    def findall(cls, p, s):
-        """查找字符串中指定子串的所有位置
-        :param p: 要查找的子串（关键词）
-        :param s: 目标字符串
-        :return: 子串所有起始位置的列表
-        注：暂未处理子串作为其他单词一部分的情况
-        """
-        i = s.find(p)
-        positions = []
-        while i != -1:
-            positions.append(i)
-            i = s.find(p, i + 1)  # 从下一个位置继续查找
-        return positions
@@ -30,7 +30,7 @@ class ResetUserVotesView(FormView):
         """根据URL中的ID参数获取目标用户对象"""
         user_id = self.kwargs.get('id') or None
         if user_id:
-            return User.objects.get(pk=user_id)
+            return User.objects.filter(pk=user_id).first()
         return None
 
     def get_context_data(self, **kwargs):
@@ -56,11 +56,12 @@ class ResetUserVotesView(FormView):
         user = self.get_user()
         if not user:
             messages.error(self.request, "用户不存在")
-        else:
-            # 删除该用户的所有投票记录
-            Vote.objects.filter(user=user).delete()
+            return redirect(self.get_success_url())
 
-        # 记录管理员操作日志
+        # 删除该用户的所有投票记录（投票没有级联关系和信号，执行单条DELETE语句）
+        Vote.objects.filter(user_id=user.pk).delete()
+
+        # 记录管理员操作日志（ATOMIC_REQUESTS下与删除在同一事务中提交）
         LogEntry.objects.log_action(
             user_id=self.request.user.pk,
             content_type_id=ContentType.objects.get_for_model(User).pk,
@@ -4,6 +4,7 @@ from django.contrib.auth.models import AbstractUser as _UserType
 from django.utils.http import urlsafe_base64_decode
 from django.utils.encoding import force_str
 from django.contrib.auth import get_user_model
+from django.db.models import Q
 from django.http import HttpRequest, HttpResponseRedirect
 from django.contrib.auth import login
 from django.views.generic.base import TemplateResponseMixin, ContextMixin, View
@@ -17,6 +18,9 @@ from web.events import EventBase
 
 User = get_user_model()
 
+# 用户名格式：仅允许字母、数字、-、_、.
+USERNAME_REGEX = re.compile(r"^[\w.-]+\Z", re.ASCII)
+
 
 class OnUserSignUp(EventBase, name='on_user_signup'):
     """用户注册完成事件"""
@@ -40,6 +44,11 @@ class AcceptInvitationView(TemplateResponseMixin, ContextMixin, View):
             user = None
         return user
 
+    def _is_token_valid(self, user) -> bool:
+        """验证邀请令牌：未被使用（单次查询）且签名有效、未过期"""
+        token = self.kwargs['token']
+        return not UsedToken.is_used(token) and account_activation_token.check_token(user, token)
+
     def get(self, request, *args, **kwargs):
         """处理GET请求：展示邀请注册页面（仅未登录用户可访问）"""
         # 已登录用户直接重定向到登录后页面
@@ -51,7 +60,7 @@ class AcceptInvitationView(TemplateResponseMixin, ContextMixin, View):
         user = self.get_user()
         
         # 验证邀请令牌是否有效（未被使用且未过期）
-        if UsedToken.is_used(self.kwargs['token']) or not account_activation_token.check_token(user, self.kwargs["token"]):
+        if not self._is_token_valid(user):
             context.update({'error': '无效的邀请链接。', 'error_fatal': True})
             return self.render_to_response(context)
         
@@ -68,7 +77,7 @@ class AcceptInvitationView(TemplateResponseMixin, ContextMixin, View):
         user = self.get_user()
         
         # 再次验证邀请令牌有效性
-        if UsedToken.is_used(self.kwargs['token']) or not account_activation_token.check_token(user, self.kwargs["token"]):
+        if not self._is_token_valid(user):
             context.update({'error': '无效的邀请链接。', 'error_fatal': True})
             return self.render_to_response(context)
         
@@ -85,14 +94,12 @@ class AcceptInvitationView(TemplateResponseMixin, ContextMixin, View):
         password2 = request.POST.get('password2', '')
         
         # 验证用户名格式（仅允许字母、数字、-、_、.）
-        if not re.match(r"^[\w.-]+\Z", username, re.ASCII):
+        if not USERNAME_REGEX.match(username):
             context.update({'error': '用户名格式无效。允许使用的字符：A-Z、a-z、0-9、-、_、.。'})
             return self.render_to_response(context)
         
         # 检查用户名是否已被占用
-        user_exists = User.objects.filter(username=username)
-        wd_user_exists = User.objects.filter(wikidot_username=username)
-        if (user_exists and user_exists[0] != user) or (wd_user_exists and wd_user_exists[0] != user):
+        if User.objects.filter(Q(username=username) | Q(wikidot_username=username)).exclude(pk=user.pk).exists():
             context.update({'error': '该用户名已被使用。'})
             return self.render_to_response(context)
         